@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import career_data
+import career_predictor_simple
+
+def benchmark_engine(engine, csv_path, chunk_size=career_data.DEFAULT_CHUNK_SIZE, cache_dir=None,
+                     latency_rows=200, batch_rows=10000):
+    """Fit time, test accuracy and prediction latency of one career_predictor_simple engine.
+
+    Same split as train_model. Latencies go through predict_career_batch on
+    raw CSV rows, so they include encoding, as in the prediction server.
+    """
+    from sklearn.model_selection import train_test_split
+
+    X, y, preprocessor = career_predictor_simple.load_training_data(csv_path, chunk_size, cache_dir, engine)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    model = career_predictor_simple.build_estimator(engine, preprocessor)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    accuracy = float(np.mean(model.predict(X_test) == y_test))
+
+    model_data = {'model': model, 'preprocessor': preprocessor, 'engine': engine}
+    rows = pd.read_csv(csv_path, nrows=max(latency_rows, batch_rows))
+    single = []
+    for i in range(min(latency_rows, len(rows))):
+        start = time.perf_counter()
+        career_predictor_simple.predict_career_batch(model_data, rows.iloc[i:i + 1])
+        single.append(time.perf_counter() - start)
+    batch = rows.iloc[:batch_rows]
+    start = time.perf_counter()
+    career_predictor_simple.predict_career_batch(model_data, batch)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'engine': engine,
+        'fit_seconds': fit_seconds,
+        'rounds': getattr(model, 'n_iter_', getattr(model, 'n_estimators_', None)),
+        'accuracy': accuracy,
+        'p50_ms': float(np.percentile(single, 50)) * 1000,
+        'p95_ms': float(np.percentile(single, 95)) * 1000,
+        'batch_rows_per_second': len(batch) / batch_seconds
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the career_predictor_simple engines: fit time, accuracy and predict latency")
+    parser.add_argument('--csv', default=career_data.DEFAULT_TRAINING_CSV)
+    parser.add_argument('--chunk-size', type=int, default=career_data.DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--cache-dir', default=None, help="Compiled dataset directory (see career_data)")
+    parser.add_argument('--engines', nargs='+', choices=career_predictor_simple.ENGINES,
+                        default=list(career_predictor_simple.ENGINES))
+    parser.add_argument('--latency-rows', type=int, default=200, help="Single-row predictions timed")
+    parser.add_argument('--batch-rows', type=int, default=10000, help="Rows in the timed batch prediction")
+    args = parser.parse_args()
+
+    print(f"{'engine':<8} {'fit':>9} {'rounds':>7} {'accuracy':>9} {'p50':>9} {'p95':>9} {'batch':>13}")
+    for engine in args.engines:
+        result = benchmark_engine(engine, args.csv, args.chunk_size, args.cache_dir,
+                                  args.latency_rows, args.batch_rows)
+        print(f"{engine:<8} {result['fit_seconds']:>8.2f}s {result['rounds']:>7} "
+              f"{result['accuracy']:>9.4f} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+              f"{result['batch_rows_per_second']:>8.0f} row/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Inference-facing modules and the heavy packages they must not import eagerly
+LIGHT_MODULES = {
+    'hh': ['tensorflow', 'keras', 'sklearn'],
+    'career_predictor_simple': ['tensorflow', 'keras', 'sklearn'],
+    'prediction_server': ['tensorflow', 'keras', 'sklearn'],
+    'resume_analyzer': ['tensorflow', 'keras', 'sklearn', 'pandas', 'numpy', 'scipy'],
+    'github_analyzer_v2': ['tensorflow', 'keras', 'sklearn', 'pandas', 'numpy', 'scipy'],
+}
+
+def measure_import(module, python=sys.executable):
+    """Import module in a fresh interpreter under -X importtime.
+
+    Returns (total seconds, {imported module: cumulative seconds}).
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=here, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    # Lines are printed as imports finish, so a module's dependencies are
+    # the indented lines just before its own top-level line
+    pending = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name[1:]
+        seconds = int(cumulative_us) / 1e6
+        if name.startswith(' '):
+            pending[name.strip()] = seconds
+        elif name == module:
+            return seconds, pending
+        else:
+            # Interpreter start-up (site, encodings, ...), not caused by the module
+            pending = {}
+    raise RuntimeError(f"No import time reported for {module}")
+
+def check_module(module, forbidden, repeats=3, budget=None):
+    """Best-of-repeats import time plus the list of problems found"""
+    best, imported = None, {}
+    for _ in range(repeats):
+        total, cumulative = measure_import(module)
+        if best is None or total < best:
+            best, imported = total, cumulative
+
+    problems = []
+    for package in forbidden:
+        if any(name == package or name.startswith(package + '.') for name in imported):
+            problems.append(f"imports {package} at module level")
+    if budget is not None and best > budget:
+        problems.append(f"took {best:.2f}s (budget {budget:.2f}s)")
+    return best, imported, problems
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report import times of the inference modules and fail if heavy "
+                    "packages (TensorFlow, scikit-learn) are imported eagerly again")
+    parser.add_argument('modules', nargs='*', help="Modules to check (default: all inference modules)")
+    parser.add_argument('--repeats', type=int, default=3, help="Fresh interpreters per module; best is kept")
+    parser.add_argument('--budget', type=float, default=None, help="Fail if an import takes longer (seconds)")
+    parser.add_argument('--top', type=int, default=5, help="Slowest dependencies listed per module")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules or LIGHT_MODULES:
+        seconds, imported, problems = check_module(module, LIGHT_MODULES.get(module, []),
+                                                   args.repeats, args.budget)
+        print(f"{module}: {seconds:.2f}s" + (" FAIL" if problems else ""))
+        slowest = sorted(((t, name) for name, t in imported.items() if name != module), reverse=True)
+        # Only top-level packages, so 'pandas' is not followed by 'pandas.core' etc.
+        for t, name in [(t, name) for t, name in slowest if '.' not in name][:args.top]:
+            print(f"    {name:<30} {t:.2f}s")
+        for problem in problems:
+            print(f"    ! {problem}")
+        failed = failed or bool(problems)
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+import abc
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from career_preprocessor import (CATEGORICAL_FEATURES, NUMERICAL_FEATURES, SKILL_FEATURES,
+                                 TARGET, CareerPreprocessor)
+
+DEFAULT_TRAINING_CSV = 'realistic_career_data.csv'
+# Rows parsed per read_csv chunk; also the shuffle window of the training batches
+DEFAULT_CHUNK_SIZE = 50000
+# Bumped whenever the files written by compile_dataset change
+COMPILED_FORMAT_VERSION = 1
+
+# Compact dtypes for the columns the models use; the other columns are never parsed
+CSV_DTYPES = {
+    **{feature: np.float32 for feature in NUMERICAL_FEATURES},
+    **{feature: 'category' for feature in CATEGORICAL_FEATURES},
+    **{feature: str for feature in SKILL_FEATURES},
+    TARGET: 'category'
+}
+
+def read_chunks(path=DEFAULT_TRAINING_CSV, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the training CSV as DataFrames of at most chunk_size rows"""
+    with pd.read_csv(path, usecols=list(CSV_DTYPES), dtype=CSV_DTYPES, chunksize=chunk_size) as reader:
+        yield from reader
+
+def split_mask(chunk_index, num_rows, validation_fraction=0.2, seed=42):
+    """True for the rows of a chunk held out for validation.
+
+    Drawn from a generator seeded by the chunk number, so every pass over
+    the same file with the same chunk_size selects the same rows.
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    return rng.random(num_rows) < validation_fraction
+
+def fit_preprocessor(path=DEFAULT_TRAINING_CSV, chunk_size=DEFAULT_CHUNK_SIZE, preprocessor=None):
+    """First pass: fit a CareerPreprocessor chunk by chunk.
+
+    Only one chunk is in memory at a time, and the result is the same as
+    CareerPreprocessor().fit() on the whole file. Returns the preprocessor
+    and the number of rows read.
+    """
+    preprocessor = preprocessor or CareerPreprocessor()
+    num_rows = 0
+    for chunk in read_chunks(path, chunk_size):
+        preprocessor.partial_fit(chunk)
+        num_rows += len(chunk)
+    if num_rows == 0:
+        raise ValueError(f"No training rows in {path}")
+    return preprocessor, num_rows
+
+def iter_encoded_chunks(preprocessor, path=DEFAULT_TRAINING_CSV, chunk_size=DEFAULT_CHUNK_SIZE,
+                        subset=None, validation_fraction=0.2, seed=42):
+    """Second pass: yield (features, y) per chunk, features as from preprocessor.transform.
+
+    subset is None for every row, or 'training' / 'validation' for one
+    side of split_mask. y holds the int32 class indices.
+    """
+    for chunk_index, chunk in enumerate(read_chunks(path, chunk_size)):
+        if subset is not None:
+            validation = split_mask(chunk_index, len(chunk), validation_fraction, seed)
+            chunk = chunk[validation if subset == 'validation' else ~validation]
+        if len(chunk) == 0:
+            continue
+        yield preprocessor.transform(chunk), preprocessor.encode_target(chunk[TARGET])
+
+class TrainingData(abc.ABC):
+    """Encoded training rows plus the preprocessor fitted on them.
+
+    Subclasses set preprocessor and num_rows, yield the rows chunk by chunk
+    (iter_encoded_chunks) and report how many rows each chunk has
+    (chunk_row_counts); batching and the tf.data pipeline are shared.
+    subset is None for every row, or 'training' / 'validation' for one
+    side of the split.
+    """
+
+    @abc.abstractmethod
+    def iter_encoded_chunks(self, subset=None, rng=None):
+        """Yield (preprocessor.transform output, labels) per chunk; rng may shuffle the chunk order"""
+
+    @abc.abstractmethod
+    def chunk_row_counts(self, subset=None):
+        """Rows per chunk, in the order iter_encoded_chunks yields them"""
+
+    def iter_batches(self, batch_size=32, subset=None, shuffle_seed=None):
+        """Yield (X_numerical, X_categorical, X_skills, y) batches, as from preprocessor.transform.
+
+        Memory stays bounded by one encoded chunk. Batches never span two
+        chunks, and with a shuffle_seed rows are shuffled within each chunk.
+        """
+        rng = np.random.default_rng(shuffle_seed) if shuffle_seed is not None else None
+        for (X_numerical, X_categorical, X_skills), y in self.iter_encoded_chunks(subset, rng):
+            order = rng.permutation(len(y)) if rng is not None else np.arange(len(y))
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                yield X_numerical[rows], X_categorical[rows], X_skills[rows], y[rows]
+
+    def count_batches(self, batch_size=32, subset=None):
+        """Number of batches iter_batches yields"""
+        return sum(-(-rows // batch_size) for rows in self.chunk_row_counts(subset))
+
+    def num_samples(self, subset=None):
+        return sum(self.chunk_row_counts(subset))
+
+    def load_arrays(self, subset=None):
+        """The whole subset as hh.build_model inputs plus int32 labels, in memory.
+
+        Every input is one contiguous array, categorical codes included,
+        and skills are dense: expect about 4 bytes per row per feature.
+        """
+        chunks = list(self.iter_encoded_chunks(subset))
+        if not chunks:
+            raise ValueError(f"No rows in subset {subset!r}")
+        X_numerical = np.concatenate([features[0] for features, _ in chunks])
+        X_categorical = np.concatenate([features[1] for features, _ in chunks])
+        X_skills = sparse.vstack([features[2] for features, _ in chunks], format='csr').toarray()
+        y = np.concatenate([labels for _, labels in chunks])
+        del chunks
+        inputs = [np.ascontiguousarray(X_numerical), X_skills]
+        inputs += [np.ascontiguousarray(X_categorical[:, i]) for i in range(X_categorical.shape[1])]
+        return inputs, y
+
+    def make_dataset(self, batch_size=32, subset=None, shuffle=False, seed=42, in_memory=False):
+        """tf.data pipeline of (model inputs, one-hot targets) for hh.build_model.
+
+        By default each iteration (i.e. each epoch) goes through iter_batches
+        again, so the dataset never has to fit in memory. With in_memory the
+        rows are encoded once (load_arrays) and batches are gathered from
+        them inside TensorFlow, which is much faster when they fit. With
+        shuffle, every epoch gets a different order.
+        """
+        if in_memory:
+            return self._make_in_memory_dataset(batch_size, subset, shuffle, seed)
+
+        import tensorflow as tf
+
+        preprocessor = self.preprocessor
+        num_classes = preprocessor.num_classes
+        num_categorical = len(preprocessor.categorical)
+        identity = np.eye(num_classes, dtype=np.float32)
+        shuffle_seeds = np.random.default_rng(seed)
+
+        def generator():
+            shuffle_seed = int(shuffle_seeds.integers(2 ** 32)) if shuffle else None
+            for X_numerical, X_categorical, X_skills, y in self.iter_batches(batch_size, subset, shuffle_seed):
+                # Same input order as hh.build_model_inputs
+                inputs = (X_numerical, X_skills.toarray()) + tuple(X_categorical[:, i]
+                                                                  for i in range(num_categorical))
+                yield inputs, identity[y]
+
+        input_signature = (
+            tf.TensorSpec((None, len(preprocessor.numerical)), tf.float32),
+            tf.TensorSpec((None, preprocessor.skill_featurizer.n_features_), tf.float32)
+        ) + tuple(tf.TensorSpec((None,), tf.int32) for _ in range(num_categorical))
+        output_signature = (input_signature, tf.TensorSpec((None, num_classes), tf.float32))
+        dataset = tf.data.Dataset.from_generator(generator, output_signature=output_signature)
+        # Keras needs the number of batches for its progress bar and to end epochs cleanly
+        dataset = dataset.apply(tf.data.experimental.assert_cardinality(self.count_batches(batch_size, subset)))
+        return dataset.prefetch(2)
+
+    def _make_in_memory_dataset(self, batch_size, subset, shuffle, seed):
+        import tensorflow as tf
+
+        arrays, y = self.load_arrays(subset)
+        inputs = tuple(tf.constant(array) for array in arrays)
+        labels = tf.constant(y)
+        num_classes = self.preprocessor.num_classes
+
+        def gather(rows):
+            # One vectorized gather per input instead of per-row work
+            return (tuple(tf.gather(tensor, rows) for tensor in inputs),
+                    tf.one_hot(tf.gather(labels, rows), num_classes))
+
+        rows = tf.data.Dataset.range(len(y))
+        if shuffle:
+            rows = rows.shuffle(len(y), seed=seed, reshuffle_each_iteration=True)
+        dataset = rows.batch(batch_size).map(gather, num_parallel_calls=tf.data.AUTOTUNE)
+        if not shuffle:
+            # The same batches every epoch, e.g. validation: build them once
+            dataset = dataset.cache()
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+class CsvDataset(TrainingData):
+    """Training rows parsed and encoded from the CSV on every pass.
+
+    Construction makes the first pass (fit_preprocessor); every epoch then
+    re-reads the file, split into training and validation by split_mask.
+    """
+
+    def __init__(self, path=DEFAULT_TRAINING_CSV, chunk_size=DEFAULT_CHUNK_SIZE,
+                 validation_fraction=0.2, seed=42):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.validation_fraction = validation_fraction
+        self.seed = seed
+        self.preprocessor, self.num_rows = fit_preprocessor(path, chunk_size)
+
+    def iter_encoded_chunks(self, subset=None, rng=None):
+        # The file is read front to back, so rng cannot reorder the chunks
+        return iter_encoded_chunks(self.preprocessor, self.path, self.chunk_size, subset,
+                                   self.validation_fraction, self.seed)
+
+    def chunk_row_counts(self, subset=None):
+        for chunk_index, start in enumerate(range(0, self.num_rows, self.chunk_size)):
+            rows = min(self.chunk_size, self.num_rows - start)
+            if subset is not None:
+                validation = int(split_mask(chunk_index, rows, self.validation_fraction, self.seed).sum())
+                rows = validation if subset == 'validation' else rows - validation
+            yield rows
+
+def source_fingerprint(path, chunk_size=DEFAULT_CHUNK_SIZE, validation_fraction=0.2, seed=42):
+    """What a compiled dataset was built from; any change means it must be rebuilt"""
+    stat = os.stat(path)
+    return {
+        'format_version': COMPILED_FORMAT_VERSION,
+        'source': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'chunk_size': chunk_size,
+        'validation_fraction': validation_fraction,
+        'seed': seed
+    }
+
+def compile_dataset(path, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, validation_fraction=0.2, seed=42):
+    """Encode the CSV once into memory-mappable .npy files in output_dir.
+
+    Writes numerical.npy (float32), categorical.npy (int32, Fortran order),
+    skills_indptr.npy / skills_indices.npy (the CSR skill matrix, whose
+    values are all 1), labels.npy (int32), validation.npy (the split),
+    preprocessor.joblib and, last, manifest.json with the source
+    fingerprint and the preprocessor digest. Both passes stream the CSV.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    # Without a manifest a half-written directory is never mistaken for a valid one
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    fingerprint = source_fingerprint(path, chunk_size, validation_fraction, seed)
+    preprocessor, num_rows = fit_preprocessor(path, chunk_size)
+
+    def create(name, dtype, shape, fortran_order=False):
+        return np.lib.format.open_memmap(os.path.join(output_dir, name), mode='w+', dtype=dtype,
+                                         shape=shape, fortran_order=fortran_order)
+
+    numerical = create('numerical.npy', np.float32, (num_rows, len(preprocessor.numerical)))
+    categorical = create('categorical.npy', np.int32, (num_rows, len(preprocessor.categorical)),
+                         fortran_order=True)
+    labels = create('labels.npy', np.int32, (num_rows,))
+    validation = create('validation.npy', np.bool_, (num_rows,))
+    indptr = create('skills_indptr.npy', np.int64, (num_rows + 1,))
+    indptr[0] = 0
+
+    # The number of skill tokens is only known at the end: stream the
+    # indices to a raw file, then copy them into a sized .npy
+    raw_indices_path = os.path.join(output_dir, 'skills_indices.raw')
+    start = 0
+    with open(raw_indices_path, 'wb') as raw_indices:
+        for chunk_index, ((X_numerical, X_categorical, X_skills), y) in enumerate(
+                iter_encoded_chunks(preprocessor, path, chunk_size)):
+            end = start + len(y)
+            numerical[start:end] = X_numerical
+            categorical[start:end] = X_categorical
+            labels[start:end] = y
+            validation[start:end] = split_mask(chunk_index, len(y), validation_fraction, seed)
+            X_skills.sort_indices()
+            indptr[start + 1:end + 1] = X_skills.indptr[1:] + indptr[start]
+            X_skills.indices.astype(np.int32).tofile(raw_indices)
+            start = end
+
+    nnz = int(indptr[-1])
+    indices = create('skills_indices.npy', np.int32, (nnz,))
+    if nnz:
+        raw = np.memmap(raw_indices_path, dtype=np.int32, mode='r', shape=(nnz,))
+        for offset in range(0, nnz, chunk_size * 16):
+            indices[offset:offset + chunk_size * 16] = raw[offset:offset + chunk_size * 16]
+        del raw
+    os.remove(raw_indices_path)
+
+    for array in (numerical, categorical, labels, validation, indptr, indices):
+        array.flush()
+    joblib.dump(preprocessor, os.path.join(output_dir, 'preprocessor.joblib'))
+
+    manifest = dict(fingerprint, num_rows=num_rows, skills_nnz=nnz,
+                    preprocessor_digest=preprocessor.digest())
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return CompiledDataset(output_dir)
+
+class CompiledDataset(TrainingData):
+    """A dataset written by compile_dataset, memory-mapped instead of parsed.
+
+    Opening it reads only the manifest and the preprocessor; rows are paged
+    in from the .npy files as batches need them. Chunks are blocks of
+    chunk_size consecutive rows, visited in random order when shuffling.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as file:
+            self.manifest = json.load(file)
+        if self.manifest.get('format_version') != COMPILED_FORMAT_VERSION:
+            raise ValueError(f"{directory} was compiled by another version; compile it again")
+        self.preprocessor = joblib.load(os.path.join(directory, 'preprocessor.joblib'))
+        if self.preprocessor.digest() != self.manifest['preprocessor_digest']:
+            raise ValueError(f"{directory}/preprocessor.joblib does not match its manifest")
+
+        self.num_rows = self.manifest['num_rows']
+        self.chunk_size = self.manifest['chunk_size']
+        self.numerical = self._load('numerical.npy')
+        self.categorical = self._load('categorical.npy')
+        self.labels = self._load('labels.npy')
+        self.validation = self._load('validation.npy')
+        self.skills_indptr = self._load('skills_indptr.npy')
+        self.skills_indices = self._load('skills_indices.npy')
+
+    def _load(self, name):
+        return np.load(os.path.join(self.directory, name), mmap_mode='r')
+
+    def matches(self, path, chunk_size=DEFAULT_CHUNK_SIZE, validation_fraction=0.2, seed=42):
+        """Whether this was compiled from path, unchanged since, with the same settings"""
+        fingerprint = source_fingerprint(path, chunk_size, validation_fraction, seed)
+        return all(self.manifest.get(key) == value for key, value in fingerprint.items())
+
+    def _skills(self, start, end):
+        indptr = np.asarray(self.skills_indptr[start:end + 1])
+        indices = np.asarray(self.skills_indices[indptr[0]:indptr[-1]])
+        return sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr - indptr[0]),
+                                 shape=(end - start, self.preprocessor.skill_featurizer.n_features_))
+
+    def _subset_rows(self, start, end, subset):
+        """Positions within rows start:end that belong to subset (None for all)"""
+        if subset is None:
+            return None
+        validation = np.asarray(self.validation[start:end])
+        return np.flatnonzero(validation if subset == 'validation' else ~validation)
+
+    def iter_encoded_chunks(self, subset=None, rng=None):
+        starts = np.arange(0, self.num_rows, self.chunk_size)
+        if rng is not None:
+            starts = rng.permutation(starts)
+        for start in starts:
+            end = min(start + self.chunk_size, self.num_rows)
+            rows = self._subset_rows(start, end, subset)
+            if rows is not None and len(rows) == 0:
+                continue
+            features = (np.asarray(self.numerical[start:end]), np.asarray(self.categorical[start:end]),
+                        self._skills(start, end))
+            y = np.asarray(self.labels[start:end])
+            if rows is not None:
+                features = tuple(part[rows] for part in features)
+                y = y[rows]
+            yield features, y
+
+    def chunk_row_counts(self, subset=None):
+        for start in range(0, self.num_rows, self.chunk_size):
+            end = min(start + self.chunk_size, self.num_rows)
+            rows = self._subset_rows(start, end, subset)
+            yield end - start if rows is None else len(rows)
+
+def open_dataset(path=DEFAULT_TRAINING_CSV, chunk_size=DEFAULT_CHUNK_SIZE, cache_dir=None,
+                 validation_fraction=0.2, seed=42):
+    """Training data for path, through a compiled copy in cache_dir when given.
+
+    The compiled copy is (re)built when missing or when the CSV or the
+    split settings changed since it was built; later runs only memory-map
+    it. Without cache_dir the CSV is streamed on every pass (CsvDataset).
+    """
+    if cache_dir is None:
+        return CsvDataset(path, chunk_size, validation_fraction, seed)
+    if os.path.exists(os.path.join(cache_dir, 'manifest.json')):
+        try:
+            dataset = CompiledDataset(cache_dir)
+            if dataset.matches(path, chunk_size, validation_fraction, seed):
+                return dataset
+        except (OSError, ValueError) as e:
+            print(f"Recompiling {cache_dir}: {e}")
+    print(f"Compiling {path} into {cache_dir}...")
+    return compile_dataset(path, cache_dir, chunk_size, validation_fraction, seed)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile a training CSV into memory-mapped arrays for repeated training runs")
+    parser.add_argument('csv', nargs='?', default=DEFAULT_TRAINING_CSV)
+    parser.add_argument('-o', '--output', default=None,
+                        help="Output directory (default: the CSV path with .compiled appended)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows read from the CSV at a time")
+    parser.add_argument('--force', action='store_true', help="Recompile even if up to date")
+    args = parser.parse_args()
+
+    output = args.output or args.csv + '.compiled'
+    if args.force:
+        dataset = compile_dataset(args.csv, output, args.chunk_size)
+    else:
+        dataset = open_dataset(args.csv, args.chunk_size, output)
+    print(f"{output}: {dataset.num_rows} rows, {dataset.manifest['skills_nnz']} skill tokens, "
+          f"preprocessor {dataset.manifest['preprocessor_digest'][:12]}")
+
+if __name__ == "__main__":
+    main()
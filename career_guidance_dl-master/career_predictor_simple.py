@@ -1,50 +1,127 @@
+import argparse
+import json
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import GradientBoostingClassifier
-from sklearn.metrics import classification_report, accuracy_score
 import joblib
+from scipy import sparse
+import career_data
+from career_preprocessor import TARGET, CareerPreprocessor
 
-def prepare_data(df):
-    # Prepare numerical features
-    numerical_features = ['Problem-Solving Score', 'Coding Experience (Years)', 
-                         'Work_Experience', 'Project Experience']
-    X_numerical = df[numerical_features].values
-    
-    # Prepare categorical features
-    categorical_features = ['Technical_Skills', 'Soft_Skills', 'Academic Background', 
-                          'Personality Type', 'Work Preference']
-    
-    # Initialize label encoders
-    encoders = {}
-    X_categorical_encoded = []
-    
-    for feature in categorical_features:
-        encoder = LabelEncoder()
-        encoded_feature = encoder.fit_transform(df[feature])
-        X_categorical_encoded.append(encoded_feature)
-        encoders[feature] = encoder
-    
-    # Combine features
-    X = np.column_stack([X_numerical] + X_categorical_encoded)
-    
-    # Encode target
-    target_encoder = LabelEncoder()
-    y = target_encoder.fit_transform(df['Recommended Career'])
-    
-    # Scale features
-    scaler = StandardScaler()
-    X = scaler.fit_transform(X)
-    
-    return X, y, encoders, target_encoder, scaler
+# Rows scored per predict_proba call in batch mode
+DEFAULT_CHUNK_SIZE = 10000
+
+# 'hist': HistGradientBoostingClassifier on a dense matrix, multi-threaded,
+# with native categorical splits and early stopping.
+# 'gbm': the original single-threaded GradientBoostingClassifier on CSR.
+ENGINES = ('hist', 'gbm')
+DEFAULT_ENGINE = 'hist'
+# HistGradientBoosting bins each feature into at most this many values
+HIST_MAX_BINS = 255
+
+# scikit-learn is imported by the training functions only; unpickling a
+# bundle in load_model imports just the estimator classes it contains
+
+def to_matrix(features):
+    """One CSR matrix from CareerPreprocessor.transform output.
+
+    Categorical codes are used as-is: the trees only split on thresholds,
+    so scaling them (as before) never changed a prediction.
+    """
+    X_numerical, X_categorical, X_skills = features
+    X = np.hstack([X_numerical, X_categorical.astype(np.float32)])
+    # Append the multi-hot skill tokens (left unscaled, they are 0/1)
+    return sparse.hstack([sparse.csr_matrix(X), X_skills], format='csr')
+
+def to_dense_matrix(features):
+    """to_matrix as a dense float32 array, for the 'hist' engine (same column order)"""
+    X_numerical, X_categorical, X_skills = features
+    return np.hstack([X_numerical, X_categorical.astype(np.float32), X_skills.toarray()])
+
+def engine_matrix(features, engine):
+    return to_dense_matrix(features) if engine == 'hist' else to_matrix(features)
+
+def categorical_columns(preprocessor):
+    """Matrix columns of the categorical codes that fit HistGradientBoosting's bins.
+
+    Features with more categories than bins stay ordinal codes.
+    """
+    offset = len(preprocessor.numerical)
+    return [offset + i for i, feature in enumerate(preprocessor.categorical)
+            if preprocessor.vocab_sizes[feature] <= HIST_MAX_BINS]
+
+# Estimator settings per engine; build_estimator's params override them
+ENGINE_PARAMS = {
+    # Stops once 10 rounds bring no gain on a held-out 10% of the training rows
+    'hist': {
+        'learning_rate': 0.1,
+        'max_iter': 500,
+        'max_leaf_nodes': 31,
+        'early_stopping': True,
+        'validation_fraction': 0.1,
+        'n_iter_no_change': 10,
+        'random_state': 42
+    },
+    'gbm': {
+        'n_estimators': 200,
+        'learning_rate': 0.1,
+        'max_depth': 5,
+        'random_state': 42
+    }
+}
+
+def build_estimator(engine, preprocessor, params=None):
+    """Untrained estimator for engine (see ENGINES), with params overriding ENGINE_PARAMS"""
+    if engine not in ENGINE_PARAMS:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    params = {**ENGINE_PARAMS[engine], **(params or {})}
+    if engine == 'hist':
+        # Uses every core (OpenMP) unless limited, e.g. by hyperparameter_search
+        from sklearn.ensemble import HistGradientBoostingClassifier
+
+        return HistGradientBoostingClassifier(
+            max_bins=HIST_MAX_BINS,
+            categorical_features=categorical_columns(preprocessor) or None,
+            **params
+        )
+    from sklearn.ensemble import GradientBoostingClassifier
+
+    return GradientBoostingClassifier(**params)
+
+def prepare_data(df, engine=DEFAULT_ENGINE):
+    preprocessor = CareerPreprocessor()
+    X = engine_matrix(preprocessor.fit_transform(df), engine)
+    y = preprocessor.encode_target(df[TARGET])
+    return X, y, preprocessor
+
+def load_training_data(csv_path=career_data.DEFAULT_TRAINING_CSV, chunk_size=career_data.DEFAULT_CHUNK_SIZE,
+                       cache_dir=None, engine=DEFAULT_ENGINE, dataset=None, subset=None):
+    """prepare_data for a CSV read in chunks (see career_data.open_dataset).
+
+    Only the float32 matrix of the whole file is held in memory, never the
+    parsed DataFrame. With cache_dir the encoded rows come from a compiled
+    copy of the CSV instead. An already opened dataset can be passed in,
+    and subset selects one side of its split.
+    """
+    dataset = dataset or career_data.open_dataset(csv_path, chunk_size, cache_dir)
+    preprocessor = dataset.preprocessor
+    matrices, targets = [], []
+    for features, y in dataset.iter_encoded_chunks(subset):
+        matrices.append(engine_matrix(features, engine))
+        targets.append(y)
+    if engine == 'hist':
+        X = np.vstack(matrices)
+    else:
+        X = sparse.vstack(matrices, format='csr')
+    return X, np.concatenate(targets), preprocessor
+
+def train_model(csv_path=career_data.DEFAULT_TRAINING_CSV, chunk_size=career_data.DEFAULT_CHUNK_SIZE,
+                cache_dir=None, engine=DEFAULT_ENGINE, params=None):
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import classification_report, accuracy_score
 
-def train_model():
     print("Loading data...")
-    df = pd.read_csv("realistic_career_data.csv")
-    
-    print("Preparing data...")
-    X, y, encoders, target_encoder, scaler = prepare_data(df)
+    X, y, preprocessor = load_training_data(csv_path, chunk_size, cache_dir, engine)
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -52,15 +129,12 @@ def train_model():
     )
     
     # Create and train model
-    print("Training model...")
-    model = GradientBoostingClassifier(
-        n_estimators=200,
-        learning_rate=0.1,
-        max_depth=5,
-        random_state=42
-    )
+    print(f"Training model ({engine})...")
+    model = build_estimator(engine, preprocessor, params)
     
     model.fit(X_train, y_train)
+    if engine == 'hist':
+        print(f"Stopped after {model.n_iter_} boosting rounds")
     
     # Make predictions
     y_pred = model.predict(X_test)
@@ -72,52 +146,79 @@ def train_model():
     # Print classification report
     print("\nDetailed Classification Report:")
     print(classification_report(y_test, y_pred, 
-                              target_names=target_encoder.classes_))
+                              target_names=preprocessor.classes_))
     
     # Save model and preprocessors
     model_data = {
         'model': model,
-        'encoders': encoders,
-        'target_encoder': target_encoder,
-        'scaler': scaler
+        'preprocessor': preprocessor,
+        'engine': engine
     }
     joblib.dump(model_data, 'career_predictor_simple.joblib')
     print("\nModel saved as 'career_predictor_simple.joblib'")
     
     return model_data, accuracy
 
+def load_model(path='career_predictor_simple.joblib'):
+    """Load the model bundle saved by train_model"""
+    return joblib.load(path)
+
+def encode_features(model_data, input_data):
+    """Build the feature matrix for every row of input_data (left unmodified)"""
+    # Bundles saved before engines were configurable hold a 'gbm' model
+    return engine_matrix(model_data['preprocessor'].transform(input_data),
+                         model_data.get('engine', 'gbm'))
+
+def iter_predict_career_batch(model_data, chunks):
+    """Yield (prediction, probabilities) for each DataFrame chunk"""
+    model = model_data['model']
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        X = encode_features(model_data, chunk)
+        # One predict_proba call per chunk; the argmax matches model.predict
+        probabilities = model.predict_proba(X)
+        prediction = model.classes_.take(np.argmax(probabilities, axis=1))
+        yield prediction, probabilities
+
+def predict_career_batch(model_data, input_data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score a DataFrame (or an iterable of DataFrame chunks) in bulk.
+
+    Returns predictions and probabilities aligned with the input rows.
+    """
+    if isinstance(input_data, pd.DataFrame):
+        chunks = (input_data.iloc[start:start + chunk_size]
+                  for start in range(0, len(input_data), chunk_size))
+    else:
+        chunks = input_data
+    
+    predictions, probabilities = [], []
+    for prediction, chunk_probabilities in iter_predict_career_batch(model_data, chunks):
+        predictions.append(prediction)
+        probabilities.append(chunk_probabilities)
+    
+    if not predictions:
+        num_classes = model_data['preprocessor'].num_classes
+        return np.empty(0, dtype=int), np.empty((0, num_classes))
+    return np.concatenate(predictions), np.vstack(probabilities)
+
 def predict_career(model_data, input_data):
-    # Prepare input features
-    numerical_features = ['Problem-Solving Score', 'Coding Experience (Years)', 
-                         'Work_Experience', 'Project Experience']
-    categorical_features = ['Technical_Skills', 'Soft_Skills', 'Academic Background', 
-                          'Personality Type', 'Work Preference']
-    
-    # Extract numerical features
-    X_numerical = input_data[numerical_features].values
-    
-    # Encode categorical features
-    X_categorical_encoded = []
-    for feature in categorical_features:
-        encoder = model_data['encoders'][feature]
-        encoded_feature = encoder.transform([input_data[feature].iloc[0]])
-        X_categorical_encoded.append(encoded_feature)
-    
-    # Combine features
-    X = np.column_stack([X_numerical] + X_categorical_encoded)
-    
-    # Scale features
-    X = model_data['scaler'].transform(X)
-    
-    # Make prediction
-    prediction = model_data['model'].predict(X)
-    probabilities = model_data['model'].predict_proba(X)
-    
-    return prediction, probabilities
+    return predict_career_batch(model_data, input_data)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the gradient boosting career model")
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE)
+    parser.add_argument('--params', type=json.loads, default=None,
+                        help="JSON object of estimator settings, e.g. from hyperparameter_search")
+    parser.add_argument('--csv', default=career_data.DEFAULT_TRAINING_CSV, help="Training data")
+    parser.add_argument('--chunk-size', type=int, default=career_data.DEFAULT_CHUNK_SIZE,
+                        help="Rows read from the CSV at a time")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Compile the CSV into this directory once and memory-map it on later runs")
+    args = parser.parse_args()
+
     # Train model
-    model_data, accuracy = train_model()
+    model_data, accuracy = train_model(args.csv, args.chunk_size, args.cache_dir, args.engine, args.params)
     
     # Example prediction if accuracy is good
     if accuracy >= 0.70:
@@ -135,9 +236,9 @@ if __name__ == "__main__":
         })
         
         prediction, probabilities = predict_career(model_data, example_data)
-        predicted_career = model_data['target_encoder'].inverse_transform(prediction)[0]
+        predicted_career = model_data['preprocessor'].decode_target(prediction)[0]
         print(f"Predicted Career: {predicted_career}")
         print("\nConfidence Scores:")
-        for career, prob in zip(model_data['target_encoder'].classes_, probabilities[0]):
+        for career, prob in zip(model_data['preprocessor'].classes_, probabilities[0]):
             if prob > 0.1:  # Only show significant probabilities
                 print(f"{career}: {prob:.4f}")
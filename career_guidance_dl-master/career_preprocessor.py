@@ -0,0 +1,157 @@
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from category_encoder import CategoryEncoder
+from skill_featurizer import SkillFeaturizer
+
+# Columns of the career datasets and of the analyzers' model_features dicts
+NUMERICAL_FEATURES = ['Problem-Solving Score', 'Coding Experience (Years)',
+                      'Work_Experience', 'Project Experience']
+CATEGORICAL_FEATURES = ['Academic Background', 'Personality Type', 'Work Preference']
+# Comma-joined skill lists, multi-hot encoded token by token
+SKILL_FEATURES = ['Technical_Skills', 'Soft_Skills']
+TARGET = 'Recommended Career'
+# Text columns of the model_features dicts produced by ResumeAnalyzer and GithubProfileAnalyzer
+TEXT_FEATURES = SKILL_FEATURES + CATEGORICAL_FEATURES
+
+def validate_record(record, index=0):
+    """Check one model_features dict and normalise it into a predictor row"""
+    if not isinstance(record, dict):
+        raise ValueError(f"Record {index} is not a JSON object")
+    missing = [feature for feature in NUMERICAL_FEATURES if feature not in record]
+    if missing:
+        raise ValueError(f"Record {index} is missing {', '.join(missing)}")
+    row = {feature: float(record[feature]) for feature in NUMERICAL_FEATURES}
+    # Text fields the analyzers cannot determine default to 'Unknown'
+    row.update({feature: str(record.get(feature) or 'Unknown') for feature in TEXT_FEATURES})
+    return row
+
+def rows_to_frame(rows):
+    return pd.DataFrame(rows, columns=NUMERICAL_FEATURES + TEXT_FEATURES)
+
+def features_to_frame(records):
+    """Turn a list of model_features dicts into a predictor input DataFrame"""
+    return rows_to_frame([validate_record(record, index) for index, record in enumerate(records)])
+
+class CareerPreprocessor:
+    """Fitted encoding of career records, shared by training and inference.
+
+    transform() never modifies the DataFrame it is given and returns the
+    model inputs directly: standardized numerical features (float32, C
+    order), categorical codes (int32, one contiguous column per feature,
+    0 = unseen) and the multi-hot skill matrix (float32 CSR). The target
+    labels are encoded here too, so a pickled preprocessor is everything a
+    model needs besides its weights, and loading it needs no scikit-learn.
+    """
+
+    def __init__(self, numerical=None, categorical=None, skills=None, min_frequency=1,
+                 max_tokens=None):
+        self.numerical = list(numerical or NUMERICAL_FEATURES)
+        self.categorical = list(categorical or CATEGORICAL_FEATURES)
+        self.skills = list(skills or SKILL_FEATURES)
+        self.mean_ = None
+        self.scale_ = None
+        self.encoders = {}
+        self.skill_featurizer = SkillFeaturizer(self.skills, min_frequency, max_tokens)
+        self.classes_ = np.empty(0, dtype=object)
+        self.n_samples_seen_ = 0
+        self.m2_ = None
+
+    @property
+    def vocab_sizes(self):
+        """Embedding input size per categorical feature (known categories + unknown)"""
+        return {feature: encoder.vocab_size for feature, encoder in self.encoders.items()}
+
+    @property
+    def num_classes(self):
+        return len(self.classes_)
+
+    def fit(self, df):
+        self.n_samples_seen_ = 0
+        self.mean_ = self.scale_ = self.m2_ = None
+        self.encoders = {}
+        self.skill_featurizer.reset()
+        self.classes_ = np.empty(0, dtype=object)
+        return self.partial_fit(df)
+
+    def partial_fit(self, df):
+        """Update the fit with another chunk of rows (see career_data.fit_preprocessor).
+
+        Chunk after chunk, the result matches fit() on all rows at once: the
+        numeric mean and variance are merged exactly, and categories, skill
+        tokens and career labels accumulate.
+        """
+        X_numerical = df[self.numerical].to_numpy(dtype=np.float64)
+        count = len(X_numerical)
+        if count == 0:
+            raise ValueError("Cannot fit a CareerPreprocessor on no rows")
+
+        # Merge the chunk's mean and sum of squared deviations (Chan et al.)
+        mean = X_numerical.mean(axis=0)
+        m2 = ((X_numerical - mean) ** 2).sum(axis=0)
+        if self.n_samples_seen_ == 0:
+            self.mean_, self.m2_ = mean, m2
+        else:
+            total = self.n_samples_seen_ + count
+            delta = mean - self.mean_
+            self.mean_ = self.mean_ + delta * (count / total)
+            self.m2_ = self.m2_ + m2 + delta ** 2 * (self.n_samples_seen_ * count / total)
+        self.n_samples_seen_ += count
+        # Population standard deviation, with constant columns left unscaled
+        scale = np.sqrt(self.m2_ / self.n_samples_seen_)
+        self.scale_ = np.where(scale == 0, 1.0, scale)
+
+        for feature in self.categorical:
+            encoder = self.encoders.setdefault(feature, CategoryEncoder())
+            values = np.asarray(df[feature], dtype=object)
+            encoder.fit(np.concatenate([encoder.classes_, pd.unique(values)]))
+        self.skill_featurizer.partial_fit(df)
+        if TARGET in df:
+            labels = np.concatenate([self.classes_, pd.unique(np.asarray(df[TARGET], dtype=object))])
+            self.classes_ = np.array(sorted(pd.unique(labels)), dtype=object)
+        return self
+
+    def transform(self, df):
+        """(X_numerical, X_categorical, X_skills) for every row of df"""
+        X_numerical = df[self.numerical].to_numpy(dtype=np.float32)
+        X_numerical = np.ascontiguousarray(
+            (X_numerical - self.mean_.astype(np.float32)) / self.scale_.astype(np.float32)
+        )
+
+        # Fortran order keeps each feature's codes contiguous for the per-feature Keras inputs
+        X_categorical = np.empty((len(df), len(self.categorical)), dtype=np.int32, order='F')
+        for i, feature in enumerate(self.categorical):
+            X_categorical[:, i] = self.encoders[feature].transform(df[feature].to_numpy())
+
+        X_skills = self.skill_featurizer.transform(df)
+        return X_numerical, X_categorical, X_skills
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def encode_target(self, labels):
+        """Class indices (int32) of career labels; labels must have been seen by fit"""
+        codes = pd.Categorical(np.asarray(labels, dtype=object), categories=self.classes_).codes
+        if (codes < 0).any():
+            raise ValueError("Unknown career label in target")
+        return codes.astype(np.int32)
+
+    def decode_target(self, codes):
+        """Career labels of class indices"""
+        return self.classes_[np.asarray(codes)]
+
+    def digest(self):
+        """sha256 of everything that determines the encoding, e.g. to tie a compiled dataset to it"""
+        state = {
+            'numerical': self.numerical,
+            'mean': [float(value) for value in self.mean_],
+            'scale': [float(value) for value in self.scale_],
+            'categories': {feature: [str(value) for value in encoder.classes_]
+                           for feature, encoder in self.encoders.items()},
+            'skills': self.skill_featurizer.vocabularies_,
+            'classes': [str(value) for value in self.classes_]
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# Below this many values a plain dict lookup beats building a Categorical
+SMALL_BATCH_SIZE = 32
+
+class CategoryEncoder:
+    """Dict-backed replacement for LabelEncoder on categorical feature columns.
+
+    Known categories map to codes 1..n, and any value not seen at fit time maps
+    to UNKNOWN_CODE instead of raising, so analyzer output such as 'Unknown' or
+    new skill combinations can be scored directly. Code 0 doubles as the
+    padding row of the Keras embeddings, which is why vocab_size is n + 1.
+    """
+
+    UNKNOWN_CODE = 0
+
+    def __init__(self):
+        self.classes_ = np.empty(0, dtype=object)
+        self.mapping_ = {}
+
+    @property
+    def vocab_size(self):
+        return len(self.classes_) + 1
+
+    def fit(self, values):
+        """Build the category -> code lookup table"""
+        values = pd.unique(np.asarray(values, dtype=object))
+        # Blank cells are not a category: they encode as UNKNOWN_CODE
+        values = values[~pd.isna(values)]
+        self.classes_ = np.array(sorted(values, key=str), dtype=object)
+        self.mapping_ = {value: code for code, value in enumerate(self.classes_, start=1)}
+        return self
+
+    def transform(self, values):
+        """Encode a whole column in one call; unseen values get UNKNOWN_CODE"""
+        values = np.asarray(values, dtype=object)
+        if len(values) <= SMALL_BATCH_SIZE:
+            return np.fromiter((self.mapping_.get(value, self.UNKNOWN_CODE) for value in values),
+                               dtype=np.int32, count=len(values))
+
+        # Vectorized hash lookup: Categorical codes are -1 for unseen values
+        codes = pd.Categorical(values, categories=self.classes_).codes
+        return codes.astype(np.int32) + 1
+
+    def fit_transform(self, values):
+        return self.fit(values).transform(values)
+
+    def inverse_transform(self, codes):
+        """Map codes back to categories; UNKNOWN_CODE decodes to None"""
+        lookup = np.concatenate([np.array([None], dtype=object), self.classes_])
+        return lookup[np.asarray(codes)]
@@ -0,0 +1,68 @@
+import argparse
+import base64
+import sys
+
+from github_analyzer_v2 import GithubProfileAnalyzer, ReadmeDocument
+from resume_analyzer import ResumeAnalyzer
+
+# (text, skills that must be found, skills that must not be)
+CASES = [
+    ("A CLI written in Go.", {'Go'}, set()),
+    ("Built with Golang and GOLANG tooling", {'Go'}, set()),
+    ("then go to http://localhost", set(), {'Go'}),
+    ("Run ng serve to start the app", {'Angular'}, set()),
+    ("NG stands for no good", set(), {'Angular'}),
+    ("Skills: Python, Go, Docker", {'Python', 'Go', 'Docker'}, set()),
+]
+
+def resume_skills(analyzer, text):
+    features = analyzer.extract_features(text)
+    skills = set(features['soft_skills'])
+    for names in features['technical_skills'].values():
+        skills.update(names)
+    return skills
+
+def readme_skills(analyzer, text):
+    encoded = base64.b64encode(text.encode('utf-8')).decode('ascii')
+    return analyzer.scan_document(ReadmeDocument(encoded))[0]
+
+def check(taxonomy_path=None):
+    """Problems found matching CASES through the resume and README paths"""
+    from skill_taxonomy import get_taxonomy_loader
+
+    taxonomy = get_taxonomy_loader(taxonomy_path)
+    paths = {
+        'resume': (resume_skills, ResumeAnalyzer(taxonomy=taxonomy)),
+        'readme': (readme_skills, GithubProfileAnalyzer(taxonomy=taxonomy)),
+    }
+    problems = []
+    for text, expected, unexpected in CASES:
+        for path, (find, analyzer) in paths.items():
+            found = find(analyzer, text)
+            required = expected
+            if path == 'readme':
+                # README scans only look for skills with a domain
+                required = {name for name in expected if taxonomy.get().domains_of(name)}
+            missing, extra = required - found, unexpected & found
+            if missing:
+                problems.append(f"{path}: {text!r} should match {sorted(missing)}")
+            if extra:
+                problems.append(f"{path}: {text!r} should not match {sorted(extra)}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that taxonomy skills (including case-sensitive aliases such as Go) "
+                    "are matched in resumes and READMEs, and common words are not")
+    parser.add_argument('--taxonomy', default=None, help="Skill taxonomy JSON (default: skill_taxonomy.json)")
+    args = parser.parse_args()
+
+    problems = check(args.taxonomy)
+    for problem in problems:
+        print(f"! {problem}")
+    print(f"{len(CASES)} cases, {len(problems)} problems")
+    if problems:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
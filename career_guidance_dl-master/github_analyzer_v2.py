@@ -4,108 +4,303 @@ from collections import Counter
 import json
 from datetime import datetime
 import base64
+import binascii
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from http_cache import ResponseCache
+from keyword_matcher import KeywordMatcher
+from rate_limit import RateLimitedSession, is_rate_limited
+from skill_strings import join_skills
+from skill_taxonomy import get_taxonomy_loader
+
+GITHUB_API_URL = "https://api.github.com"
+
+# README keywords that hint at problem-solving practice, with the word forms
+# that count for each (the matcher only accepts whole words)
+PROBLEM_SOLVING_INDICATORS = {
+    'algorithms': ['algorithm', 'algorithms'],
+    'leetcode': ['leetcode'],
+    'hackerrank': ['hackerrank'],
+    'competitive': ['competitive'],
+    'problem': ['problem', 'problems'],
+}
+# Matcher category reserved for the indicators above
+PROBLEM_SOLVING_CATEGORY = 'problem_solving'
+
+# Files sampled by the deep mode, and the technology their mere presence implies
+MANIFEST_FILES = {
+    'requirements.txt': None,
+    'package.json': None,
+    'pom.xml': 'java',
+    'Dockerfile': 'docker',
+}
+WORKFLOW_DIR = '.github/workflows/'
+WORKFLOW_HINT = 'github actions'
+
+class GithubAPIError(Exception):
+    """Raised when the GitHub API returns an unusable response"""
+
+class RateLimitError(GithubAPIError):
+    """Raised when GitHub keeps throttling us after all retries"""
+
+class ReadmeDocument:
+    """A README decoded once, shared by every scan of it.
+
+    The text keeps its case: KeywordMatcher lowercases for its
+    case-insensitive pass and needs the original for case-sensitive aliases.
+    """
+
+    def __init__(self, encoded_content=""):
+        try:
+            raw = base64.b64decode(encoded_content) if encoded_content else b""
+        except (binascii.Error, ValueError):
+            raw = b""
+        # Non-UTF-8 READMEs are common; replace bad bytes instead of failing the profile
+        self.text = raw.decode('utf-8', errors='replace')
+
+    @classmethod
+    def from_text(cls, text):
+        document = cls()
+        document.text = text
+        return document
+
+    def __bool__(self):
+        return bool(self.text)
+
+class FetchBudget:
+    """Thread-safe cap on the extra requests and bytes spent on one profile"""
+
+    def __init__(self, max_requests, max_bytes):
+        self.requests_left = max_requests
+        self.bytes_left = max_bytes
+        self._lock = threading.Lock()
+
+    def spend(self, requests=1, nbytes=0):
+        """Reserve budget; returns False (and spends nothing) if it would overrun"""
+        with self._lock:
+            if requests > self.requests_left or nbytes > self.bytes_left:
+                return False
+            self.requests_left -= requests
+            self.bytes_left -= nbytes
+            return True
+
+class ProfileAggregate:
+    """Running profile totals, updated one repository at a time"""
 
-class GithubProfileAnalyzer:
     def __init__(self):
-        self.tech_categories = {
-            'frontend': {
-                'languages': {'HTML', 'CSS', 'JavaScript', 'TypeScript'},
-                'frameworks': {
-                    'react': ['react', 'jsx', 'next.js'],
-                    'angular': ['angular', 'ng'],
-                    'vue': ['vue', 'nuxt'],
-                    'svelte': ['svelte'],
-                    'bootstrap': ['bootstrap'],
-                    'tailwind': ['tailwind'],
-                }
-            },
-            'backend': {
-                'languages': {'Python', 'Java', 'PHP', 'Ruby', 'Go', 'C#', 'Node.js'},
-                'frameworks': {
-                    'django': ['django'],
-                    'flask': ['flask'],
-                    'fastapi': ['fastapi'],
-                    'spring': ['spring boot', 'spring framework'],
-                    'express': ['express.js', 'express'],
-                    'laravel': ['laravel'],
-                    'rails': ['ruby on rails'],
-                }
-            },
-            'database': {
-                'technologies': {
-                    'sql': ['mysql', 'postgresql', 'sqlite', 'sql server'],
-                    'nosql': ['mongodb', 'redis', 'cassandra', 'firebase'],
-                    'orm': ['sqlalchemy', 'hibernate', 'prisma', 'sequelize']
-                }
-            },
-            'devops': {
-                'technologies': {
-                    'containerization': ['docker', 'kubernetes', 'container'],
-                    'ci_cd': ['github actions', 'jenkins', 'travis', 'gitlab ci'],
-                    'cloud': ['aws', 'azure', 'gcp', 'cloud'],
-                }
-            },
-            'ai_ml': {
-                'libraries': {
-                    'ml': ['tensorflow', 'pytorch', 'scikit-learn', 'keras'],
-                    'data': ['pandas', 'numpy', 'matplotlib', 'seaborn'],
-                    'nlp': ['nltk', 'spacy', 'transformers', 'huggingface']
-                }
-            }
-        }
+        self.num_repos = 0
+        self.total_score = 0
+        self.all_tech_stack = set()
+        self.problem_solving_indicators = {indicator: 0 for indicator in PROBLEM_SOLVING_INDICATORS}
+        self.has_team_repo = False
+        self.has_remote_repo = False
 
-    def analyze_repository(self, repo_data, readme_content=""):
-        """Analyze a single repository for technologies and complexity"""
+    def add(self, repo_analysis, indicators=()):
+        self.num_repos += 1
+        self.total_score += repo_analysis['score']
+        self.all_tech_stack.update(repo_analysis['tech_stack'])
+        for indicator in indicators:
+            self.problem_solving_indicators[indicator] += 1
+        name = repo_analysis['name'].lower()
+        self.has_team_repo = self.has_team_repo or 'team' in name
+        self.has_remote_repo = self.has_remote_repo or 'remote' in name
+
+    def profile_score(self):
+        """Profile score (1-10) over the repositories seen so far"""
+        if self.num_repos == 0:
+            return None
+        
+        # Average repository score (70% weight)
+        avg_repo_score = self.total_score / self.num_repos * 0.7
+        
+        # Technology diversity score (30% weight)
+        tech_diversity_score = min(len(self.all_tech_stack) / 5, 1) * 3
+        
+        final_score = round(avg_repo_score + tech_diversity_score)
+        return max(1, min(10, final_score))
+
+    def problem_solving_score(self):
+        return min(sum(self.problem_solving_indicators.values()) * 2, 10)
+
+class GithubProfileAnalyzer:
+    def __init__(self, api_url=GITHUB_API_URL, max_workers=8, timeout=10, cache=None,
+                 rate_limiter=None, token=None, deep=False, deep_max_requests=200,
+                 deep_max_bytes=2 * 1024 * 1024, deep_max_bytes_per_repo=128 * 1024,
+                 taxonomy=None, concurrent_profiles=1):
+        # api_url can point at a local stand-in server for testing
+        self.api_url = api_url.rstrip('/')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        # Deep mode also samples manifest files from each repository's tree,
+        # within a per-profile request/byte budget and a per-repo byte budget
+        self.deep = deep
+        self.deep_max_requests = deep_max_requests
+        self.deep_max_bytes = deep_max_bytes
+        self.deep_max_bytes_per_repo = deep_max_bytes_per_repo
+        # Optional http_cache.ResponseCache for conditional, persistent GETs
+        self.cache = cache
+
+        # One pooled keep-alive session shared by all fetch threads (of every
+        # profile analyzed at once, see github_bulk); with a
+        # rate_limit.RateLimiter every request waits for budget and is retried
+        if rate_limiter is not None:
+            self.session = RateLimitedSession(rate_limiter)
+        else:
+            self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers * concurrent_profiles)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept'] = 'application/vnd.github+json'
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+
+        # Technologies come from the shared, hot-reloaded skill taxonomy; the
+        # matcher is recompiled whenever the loader hands out a new taxonomy
+        self.taxonomy = taxonomy or get_taxonomy_loader()
+        self._matcher_taxonomy = None
+        self._tech_matcher = None
+
+    def _get(self, url, params=None):
+        """GET a GitHub API URL over the pooled session (through the cache if set)"""
+        if self.cache is not None:
+            return self.cache.get(self.session, url, params=params, timeout=self.timeout)
+        return self.session.get(url, params=params, timeout=self.timeout)
+
+    def _fetch_readme(self, username, repo_name):
+        """Return the decoded README of a repository (empty if it has none)"""
+        readme_url = f"{self.api_url}/repos/{username}/{repo_name}/readme"
+        readme_response = self._get(readme_url)
+        if is_rate_limited(readme_response):
+            raise RateLimitError("GitHub rate limit exceeded")
+        content = readme_response.json().get('content', "") if readme_response.status_code == 200 else ""
+        return ReadmeDocument(content)
+
+    def _select_manifests(self, tree):
+        """Pick manifest blobs from a Git tree listing, shallowest paths first"""
+        manifests = []
+        for entry in tree.get('tree', []):
+            if entry.get('type') != 'blob':
+                continue
+            path = entry['path']
+            name = posixpath.basename(path)
+            if name in MANIFEST_FILES or path.startswith(WORKFLOW_DIR):
+                manifests.append(entry)
+        return sorted(manifests, key=lambda entry: (entry['path'].count('/'), entry['path']))
+
+    def _fetch_manifests(self, username, repo, budget):
+        """Sample a repository's manifest files into one document.
+
+        Costs one request for the recursive tree listing plus one per file;
+        files are skipped once the repo or profile byte budget is used up.
+        """
+        branch = repo.get('default_branch') or 'HEAD'
+        if not budget.spend(requests=1):
+            return ReadmeDocument()
+        tree_url = f"{self.api_url}/repos/{username}/{repo['name']}/git/trees/{quote(branch)}"
+        tree_response = self._get(tree_url, params={'recursive': 1})
+        if is_rate_limited(tree_response):
+            raise RateLimitError("GitHub rate limit exceeded")
+        if tree_response.status_code != 200:
+            # Empty repositories answer 409; nothing to sample
+            return ReadmeDocument()
+
+        texts = []
+        repo_bytes_left = self.deep_max_bytes_per_repo
+        for entry in self._select_manifests(tree_response.json()):
+            path = entry['path']
+            # The file name alone is evidence (a Dockerfile means Docker)
+            hint = WORKFLOW_HINT if path.startswith(WORKFLOW_DIR) else MANIFEST_FILES[posixpath.basename(path)]
+            if hint:
+                texts.append(hint)
+
+            size = entry.get('size', 0)
+            if size > repo_bytes_left or not budget.spend(requests=1, nbytes=size):
+                continue
+            repo_bytes_left -= size
+            content_url = f"{self.api_url}/repos/{username}/{repo['name']}/contents/{quote(path)}"
+            content_response = self._get(content_url)
+            if is_rate_limited(content_response):
+                raise RateLimitError("GitHub rate limit exceeded")
+            if content_response.status_code == 200:
+                texts.append(ReadmeDocument(content_response.json().get('content', "")).text)
+        return ReadmeDocument.from_text('\n'.join(texts))
+
+    def _fetch_documents(self, username, repo, budget=None):
+        """Fetch a repository's README and, in deep mode, its sampled manifests"""
+        readme = self._fetch_readme(username, repo['name'])
+        manifests = self._fetch_manifests(username, repo, budget) if budget is not None else None
+        return readme, manifests
+
+    def scan_document(self, document):
+        """One pass over a README: (technologies found, problem-solving indicators found)"""
+        technologies, indicators = set(), []
+        tech_matcher = self.tech_matcher
+        for name in tech_matcher.count(document.text):
+            if PROBLEM_SOLVING_CATEGORY in tech_matcher.categories_of(name):
+                indicators.append(name)
+            else:
+                technologies.add(name)
+        return technologies, indicators
+
+    def analyze_document(self, repo_data, document, manifests=None):
+        """Analyze a repository whose README (and optional manifests) are already decoded"""
         tech_stack = set()
+        indicators = []
         
         # Add primary language
         if repo_data['language']:
             tech_stack.add(repo_data['language'])
         
-        # Analyze readme content for technologies
-        if readme_content:
-            decoded_content = base64.b64decode(readme_content).decode('utf-8').lower()
-            tech_stack.update(self._find_technologies(decoded_content))
+        # Analyze readme content for technologies and problem-solving indicators
+        if document:
+            technologies, indicators = self.scan_document(document)
+            tech_stack.update(technologies)
+        
+        # Manifests only contribute technologies, not problem-solving indicators
+        if manifests:
+            tech_stack.update(self.scan_document(manifests)[0])
         
         # Calculate repository score (0-10)
         score = self._calculate_repo_score(repo_data, len(tech_stack))
         
         return {
             'tech_stack': list(tech_stack),
-            'score': score
+            'score': score,
+            'problem_solving_indicators': indicators
         }
 
+    def analyze_repository(self, repo_data, readme_content=""):
+        """Analyze a single repository for technologies and complexity"""
+        analysis = self.analyze_document(repo_data, ReadmeDocument(readme_content))
+        return {
+            'tech_stack': analysis['tech_stack'],
+            'score': analysis['score']
+        }
+
+    @property
+    def tech_matcher(self):
+        """Matcher for the current taxonomy, recompiled only after a reload"""
+        taxonomy = self.taxonomy.get()
+        if taxonomy is not self._matcher_taxonomy:
+            self._tech_matcher = self._compile_tech_matcher(taxonomy)
+            self._matcher_taxonomy = taxonomy
+        return self._tech_matcher
+
+    def _compile_tech_matcher(self, taxonomy):
+        """Compile the taxonomy into one matcher with a name -> domain index"""
+        # Skills without a domain (soft skills) are not looked for in READMEs
+        entries = list(taxonomy.entries_by_domain())
+        # Problem-solving indicators ride along in the same scan
+        for indicator, keywords in PROBLEM_SOLVING_INDICATORS.items():
+            entries.extend((keyword, indicator, PROBLEM_SOLVING_CATEGORY) for keyword in keywords)
+        return KeywordMatcher(entries, taxonomy.case_sensitive)
+
     def _find_technologies(self, content):
         """Find all technologies mentioned in the content"""
-        found_tech = set()
-        
-        for category in self.tech_categories.values():
-            # Check languages
-            if 'languages' in category:
-                found_tech.update(lang for lang in category['languages'] 
-                                if lang.lower() in content)
-            
-            # Check frameworks
-            if 'frameworks' in category:
-                for framework, keywords in category['frameworks'].items():
-                    if any(keyword in content for keyword in keywords):
-                        found_tech.add(framework)
-            
-            # Check technologies
-            if 'technologies' in category:
-                for tech_type, technologies in category['technologies'].items():
-                    for tech in technologies:
-                        if tech in content:
-                            found_tech.add(tech)
-            
-            # Check libraries
-            if 'libraries' in category:
-                for lib_type, libraries in category['libraries'].items():
-                    for lib in libraries:
-                        if lib in content:
-                            found_tech.add(lib)
-        
-        return found_tech
+        return self.scan_document(ReadmeDocument.from_text(content))[0]
 
     def _calculate_repo_score(self, repo, tech_count):
         """Calculate a score (0-10) for a single repository"""
@@ -131,72 +326,68 @@ class GithubProfileAnalyzer:
         score = size_score + tech_score + stars_score + forks_score + watchers_score + update_score
         return round(min(score, 10), 1)
 
+    def iter_repositories(self, username, per_page=100):
+        """Yield pages of a user's repositories, following Link pagination"""
+        url = f"{self.api_url}/users/{username}/repos"
+        params = {'per_page': per_page}
+        while url:
+            response = self._get(url, params=params)
+            if is_rate_limited(response):
+                raise RateLimitError("GitHub rate limit exceeded")
+            if response.status_code != 200:
+                raise GithubAPIError("Unable to fetch repository data")
+            yield response.json()
+            # The next link already carries per_page and page in its query string
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    def iter_repository_analyses(self, username, aggregate=None):
+        """Yield per-repository analyses as they complete, in repository order.
+
+        Only one page of repositories is held at a time. If an aggregate is
+        passed it is updated after every repository, so callers can report
+        a running profile score while a large account is still being read.
+        """
+        budget = FetchBudget(self.deep_max_requests, self.deep_max_bytes) if self.deep else None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for repos in self.iter_repositories(username):
+                # Fetch the page's READMEs (and manifests) concurrently; map() keeps repo order
+                documents = executor.map(lambda repo: self._fetch_documents(username, repo, budget), repos)
+                
+                for repo, (document, manifests) in zip(repos, documents):
+                    # Analyze repository; the README was decoded once by the fetch thread
+                    analysis = self.analyze_document(repo, document, manifests)
+                    repo_analysis = {
+                        'name': repo['name'],
+                        'score': analysis['score'],
+                        'tech_stack': analysis['tech_stack']
+                    }
+                    if aggregate is not None:
+                        aggregate.add(repo_analysis, analysis['problem_solving_indicators'])
+                    yield repo_analysis
+
     def analyze_profile(self, username):
         """Analyze entire GitHub profile"""
+        executor = ThreadPoolExecutor(max_workers=1)
         try:
-            # Get user's repositories
-            repos_url = f"https://api.github.com/users/{username}/repos"
-            repos_response = requests.get(repos_url)
-            if repos_response.status_code != 200:
-                return {"error": "Unable to fetch repository data"}
-            
-            repos = repos_response.json()
-            
-            # Get user profile
-            user_url = f"https://api.github.com/users/{username}"
-            user_response = requests.get(user_url)
-            user_data = user_response.json() if user_response.status_code == 200 else {}
+            # Get user profile in the background while the repositories are read
+            user_url = f"{self.api_url}/users/{username}"
+            user_future = executor.submit(self._get, user_url)
             
             # Analyze each repository
-            repo_analyses = []
-            all_tech_stack = set()
-            total_score = 0
+            aggregate = ProfileAggregate()
+            repo_analyses = list(self.iter_repository_analyses(username, aggregate))
             
-            # Track problem solving indicators
-            problem_solving_indicators = {
-                'algorithms': 0,
-                'leetcode': 0,
-                'hackerrank': 0,
-                'competitive': 0,
-                'problem': 0
-            }
-            
-            for repo in repos:
-                # Get readme content
-                readme_url = f"https://api.github.com/repos/{username}/{repo['name']}/readme"
-                readme_response = requests.get(readme_url)
-                readme_content = readme_response.json()['content'] if readme_response.status_code == 200 else ""
-                
-                # Check for problem-solving indicators in readme
-                if readme_content:
-                    decoded_content = base64.b64decode(readme_content).decode('utf-8').lower()
-                    for indicator in problem_solving_indicators:
-                        if indicator in decoded_content:
-                            problem_solving_indicators[indicator] += 1
-                
-                # Analyze repository
-                analysis = self.analyze_repository(repo, readme_content)
-                repo_analyses.append({
-                    'name': repo['name'],
-                    'score': analysis['score'],
-                    'tech_stack': analysis['tech_stack']
-                })
-                all_tech_stack.update(analysis['tech_stack'])
-                total_score += analysis['score']
+            user_response = user_future.result()
+            if is_rate_limited(user_response):
+                raise RateLimitError("GitHub rate limit exceeded")
+            user_data = user_response.json() if user_response.status_code == 200 else {}
             
             # Calculate final profile score (1-10)
-            num_repos = len(repos)
-            if num_repos == 0:
+            if aggregate.num_repos == 0:
                 return {"error": "No repositories found"}
-            
-            # Average repository score (70% weight)
-            avg_repo_score = total_score / num_repos * 0.7
-            
-            # Technology diversity score (30% weight)
-            tech_diversity_score = min(len(all_tech_stack) / 5, 1) * 3
-            
-            final_score = round(avg_repo_score + tech_diversity_score)
-            final_score = max(1, min(10, final_score))
+            final_score = aggregate.profile_score()
+            all_tech_stack = aggregate.all_tech_stack
             
             # Calculate years of experience based on first contribution
             years_of_experience = 0
@@ -205,7 +396,7 @@ class GithubProfileAnalyzer:
                 years_of_experience = round((datetime.utcnow() - created_date).days / 365, 1)
             
             # Calculate problem-solving score
-            problem_solving_score = min(sum(problem_solving_indicators.values()) * 2, 10)
+            problem_solving_score = aggregate.problem_solving_score()
             
             # Prepare model input features
             model_features = {
@@ -213,11 +404,11 @@ class GithubProfileAnalyzer:
                 'Coding Experience (Years)': years_of_experience,
                 'Work_Experience': years_of_experience,
                 'Project Experience': final_score,
-                'Technical_Skills': ', '.join(sorted(all_tech_stack)),
-                'Soft_Skills': 'Team Player' if any('team' in repo['name'].lower() for repo in repos) else 'Unknown',
+                'Technical_Skills': join_skills(all_tech_stack),
+                'Soft_Skills': 'Team Player' if aggregate.has_team_repo else 'Unknown',
                 'Academic Background': 'Unknown',  # Cannot determine from GitHub
                 'Personality Type': 'Unknown',     # Cannot determine from GitHub
-                'Work Preference': 'Remote' if any('remote' in repo['name'].lower() for repo in repos) else 'Unknown'
+                'Work Preference': 'Remote' if aggregate.has_remote_repo else 'Unknown'
             }
             
             # Categorize technologies
@@ -229,13 +420,10 @@ class GithubProfileAnalyzer:
                 'ai_ml': []
             }
             
+            tech_matcher = self.tech_matcher
             for tech in all_tech_stack:
-                for category, content in self.tech_categories.items():
-                    if (('languages' in content and tech in content['languages']) or
-                        ('frameworks' in content and tech in content['frameworks']) or
-                        ('technologies' in content and any(tech in techs for techs in content['technologies'].values())) or
-                        ('libraries' in content and any(tech in libs for libs in content['libraries'].values()))):
-                        tech_categories[category].append(tech)
+                for category in tech_matcher.categories_of(tech):
+                    tech_categories.setdefault(category, []).append(tech)
             
             return {
                 'profile_score': final_score,
@@ -247,8 +435,13 @@ class GithubProfileAnalyzer:
                 'model_features': model_features
             }
             
+        except RateLimitError as e:
+            # Worth retrying later, unlike a missing user or a bad response
+            return {"error": str(e), "retryable": True}
         except Exception as e:
             return {"error": str(e)}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 def extract_username(input_string):
     """Extract username from GitHub URL or return the input if it's just a username"""
@@ -268,7 +461,7 @@ def main():
     username = extract_username(user_input)
     print(f"\nAnalyzing GitHub profile for user: {username}")
     
-    analyzer = GithubProfileAnalyzer()
+    analyzer = GithubProfileAnalyzer(cache=ResponseCache())
     result = analyzer.analyze_profile(username)
     
     if "error" in result:
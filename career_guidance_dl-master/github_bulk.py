@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from github_analyzer_v2 import GITHUB_API_URL, GithubProfileAnalyzer, extract_username
+from http_cache import ResponseCache
+from jsonl_file import trim_partial_line
+from rate_limit import RateLimiter
+from skill_taxonomy import get_taxonomy_loader
+
+def read_usernames(path):
+    """Read usernames / profile URLs (one per line, '#' comments allowed), de-duplicated in order"""
+    usernames = []
+    seen = set()
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            username = extract_username(line)
+            if username not in seen:
+                seen.add(username)
+                usernames.append(username)
+    return usernames
+
+def load_completed(output_path):
+    """Usernames already written to the JSON Lines output by an earlier run"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding='utf-8') as file:
+        for line in file:
+            try:
+                completed.add(json.loads(line)['username'])
+            except (ValueError, KeyError):
+                # A truncated last line (see trim_partial_line) or a foreign record
+                continue
+    return completed
+
+def analyze_profiles_bulk(analyzer, usernames, output_path, workers=4, progress=None):
+    """Analyze many profiles, appending one JSON line per finished profile.
+
+    The output file doubles as the checkpoint: profiles already present are
+    skipped, so a killed run resumes where it stopped. Profiles that are
+    still rate limited after the analyzer's retries are not written and are
+    picked up again by the next run. Returns a summary of counts.
+    """
+    # Drop a line left half-written by a killed run before appending after it
+    trim_partial_line(output_path)
+    completed = load_completed(output_path)
+    pending = [username for username in usernames if username not in completed]
+    summary = {'skipped': len(usernames) - len(pending), 'analyzed': 0, 'failed': 0, 'retry_later': 0}
+    write_lock = threading.Lock()
+
+    with open(output_path, 'a', encoding='utf-8') as output, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(analyzer.analyze_profile, username): username
+                   for username in pending}
+        for future in as_completed(futures):
+            username = futures[future]
+            result = future.result()
+
+            if result.get('retryable'):
+                summary['retry_later'] += 1
+            else:
+                summary['failed' if 'error' in result else 'analyzed'] += 1
+                with write_lock:
+                    output.write(json.dumps({'username': username, 'result': result}) + '\n')
+                    output.flush()
+
+            if progress is not None:
+                progress(username, result, summary)
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many GitHub profiles into JSON Lines")
+    parser.add_argument('usernames_file', help="File with one GitHub username or profile URL per line")
+    parser.add_argument('-o', '--output', default='github_profiles.jsonl')
+    parser.add_argument('--workers', type=int, default=4, help="Profiles analyzed concurrently")
+    parser.add_argument('--requests-per-hour', type=int, default=None,
+                        help="Initial budget before GitHub's headers are seen "
+                             "(default 5000 with a token, 60 without)")
+    parser.add_argument('--api-url', default=GITHUB_API_URL)
+    parser.add_argument('--cache', default='github_cache.sqlite', help="Response cache path")
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--deep', action='store_true',
+                        help="Also sample manifest files (requirements.txt, package.json, ...) per repo")
+    parser.add_argument('--deep-max-requests', type=int, default=200,
+                        help="Extra requests allowed per profile in deep mode")
+    parser.add_argument('--taxonomy', default=None,
+                        help="Skill taxonomy JSON (default: skill_taxonomy.json); edits apply without a restart")
+    args = parser.parse_args()
+
+    token = os.environ.get('GITHUB_TOKEN')
+    requests_per_hour = args.requests_per_hour or (5000 if token else 60)
+    analyzer = GithubProfileAnalyzer(
+        api_url=args.api_url,
+        cache=None if args.no_cache else ResponseCache(args.cache),
+        rate_limiter=RateLimiter(requests_per_hour),
+        token=token,
+        deep=args.deep,
+        deep_max_requests=args.deep_max_requests,
+        taxonomy=get_taxonomy_loader(args.taxonomy),
+        concurrent_profiles=args.workers
+    )
+
+    usernames = read_usernames(args.usernames_file)
+    print(f"Analyzing {len(usernames)} profiles into {args.output}")
+
+    def report(username, result, summary):
+        status = result['error'] if 'error' in result else f"score {result['profile_score']}"
+        done = summary['analyzed'] + summary['failed'] + summary['retry_later']
+        print(f"[{done}/{len(usernames) - summary['skipped']}] {username}: {status}")
+
+    summary = analyze_profiles_bulk(analyzer, usernames, args.output, args.workers, report)
+    print(f"\nDone: {summary['analyzed']} analyzed, {summary['failed']} failed, "
+          f"{summary['skipped']} already done, {summary['retry_later']} to retry later")
+    if summary['retry_later']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
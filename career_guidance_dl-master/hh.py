@@ -1,60 +1,48 @@
+import argparse
+
 import pandas as pd
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras.models import Model
-from tensorflow.keras.layers import Dense, Dropout, BatchNormalization, Input, Embedding, Flatten, Concatenate
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
 import joblib
-from sklearn.metrics import classification_report, precision_score, recall_score, f1_score
+import career_data
+from career_preprocessor import TARGET, CareerPreprocessor
+
+# TensorFlow and scikit-learn are imported inside the functions that use them:
+# they take seconds to import, and encoding or scoring with an already loaded
+# model needs neither (see benchmark_imports.py)
 
 def prepare_data(df):
-    # Rename categorical features to remove spaces
-    column_rename_map = {
-        'Technical_Skills': 'TechnicalSkills',
-        'Soft_Skills': 'SoftSkills',
-        'Academic Background': 'AcademicBackground',
-        'Personality Type': 'PersonalityType',
-        'Work Preference': 'WorkPreference'
-    }
-    df.rename(columns=column_rename_map, inplace=True)
-
-    # Define numerical and categorical features
-    numerical_features = ['Problem-Solving Score', 'Coding Experience (Years)', 
-                          'Work_Experience', 'Project Experience']
-    categorical_features = list(column_rename_map.values())  # Use renamed columns
-
-    # Scale numerical features
-    scaler = StandardScaler()
-    X_numerical = scaler.fit_transform(df[numerical_features])
-
-    # Encode categorical features using Label Encoding
-    encoders = {}
-    X_categorical_encoded = []
-    vocab_sizes = {}
-
-    for feature in categorical_features:
-        encoder = LabelEncoder()
-        df[feature] = encoder.fit_transform(df[feature])
-        vocab_size = df[feature].nunique() + 1  # Unique categories + 1 for padding
-        vocab_sizes[feature] = vocab_size
-        X_categorical_encoded.append(df[feature].values)
-        encoders[feature] = encoder
-
-    # Convert categorical features to NumPy array
-    X_categorical_encoded = np.column_stack(X_categorical_encoded)
-
-    # Encode target labels
-    target_encoder = LabelEncoder()
-    y = target_encoder.fit_transform(df['Recommended Career'])
-    y = keras.utils.to_categorical(y)  # Convert to one-hot encoding
-
-    return X_numerical, X_categorical_encoded, y, encoders, target_encoder, scaler, vocab_sizes
-
-def build_model(numeric_dim, categorical_vocab_sizes, num_classes):
+    """Fit a CareerPreprocessor on df (left unmodified) and encode it for build_model"""
+    preprocessor = CareerPreprocessor()
+    X_numerical, X_categorical, X_skills = preprocessor.fit_transform(df)
+    # One-hot targets for categorical cross-entropy
+    y = np.eye(preprocessor.num_classes, dtype=np.float32)[preprocessor.encode_target(df[TARGET])]
+    return X_numerical, X_categorical, X_skills, y, preprocessor
+
+def build_model_inputs(X_numerical, X_categorical, X_skills):
+    """Arrange feature arrays in the input order expected by build_model"""
+    return ([X_numerical, X_skills.toarray()] +
+            [X_categorical[:, i] for i in range(X_categorical.shape[1])])
+
+# Hidden layer widths and their dropout rates, as originally hard-coded
+DEFAULT_HIDDEN_UNITS = (256, 128, 64)
+DEFAULT_DROPOUT_RATES = (0.4, 0.3, 0.2)
+DEFAULT_LEARNING_RATE = 0.001
+
+def build_model(numeric_dim, categorical_vocab_sizes, num_classes, skill_dim,
+                hidden_units=DEFAULT_HIDDEN_UNITS, dropout_rates=DEFAULT_DROPOUT_RATES,
+                learning_rate=DEFAULT_LEARNING_RATE, jit_compile='auto', mixed_precision=False):
+    """Compiled Keras model; dropout_rates is one rate per hidden layer, or a single rate for all"""
+    import tensorflow as tf
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.layers import Dense, Dropout, BatchNormalization, Input, Embedding, Flatten, Concatenate
+
+    # bfloat16 compute with float32 weights; a per-layer policy rather than
+    # the global one, so other models are unaffected
+    dtype = 'mixed_bfloat16' if mixed_precision else None
+
     # Input layers
     numerical_input = Input(shape=(numeric_dim,), name="numerical_input")
+    skills_input = Input(shape=(skill_dim,), name="skills_input")
     categorical_inputs = []
 
     # Embedding layers for categorical features
@@ -62,72 +50,117 @@ def build_model(numeric_dim, categorical_vocab_sizes, num_classes):
     for feature, vocab_size in categorical_vocab_sizes.items():
         safe_feature_name = feature.replace(" ", "_")  # Ensure no spaces in names
         inp = Input(shape=(1,), name=f"{safe_feature_name}_input")
-        emb = Embedding(input_dim=vocab_size, output_dim=min(10, vocab_size // 2), name=f"{safe_feature_name}_embedding")(inp)
-        emb = Flatten()(emb)
+        emb = Embedding(input_dim=vocab_size, output_dim=min(10, vocab_size // 2),
+                        name=f"{safe_feature_name}_embedding", dtype=dtype)(inp)
+        emb = Flatten(dtype=dtype)(emb)
         embeddings.append(emb)
         categorical_inputs.append(inp)
 
-    # Concatenate numerical and categorical embeddings
-    merged = Concatenate()([numerical_input] + embeddings)
+    # Concatenate numerical features, skill tokens and categorical embeddings
+    merged = Concatenate(dtype=dtype)([numerical_input, skills_input] + embeddings)
 
     # Deep Neural Network
-    x = Dense(256, activation='relu')(merged)
-    x = BatchNormalization()(x)
-    x = Dropout(0.4)(x)
+    if isinstance(dropout_rates, (int, float)):
+        dropout_rates = [dropout_rates] * len(hidden_units)
+    if len(dropout_rates) != len(hidden_units):
+        raise ValueError("Need one dropout rate per hidden layer")
+    x = merged
+    for units, rate in zip(hidden_units, dropout_rates):
+        x = Dense(units, activation='relu', dtype=dtype)(x)
+        x = BatchNormalization(dtype=dtype)(x)
+        x = Dropout(rate, dtype=dtype)(x)
+
+    # The softmax always runs in float32
+    output = Dense(num_classes, activation='softmax', name="output_layer", dtype='float32')(x)
+
+    model = Model(inputs=[numerical_input, skills_input] + categorical_inputs, outputs=output)
+    model.compile(optimizer=tf.keras.optimizers.AdamW(learning_rate=learning_rate),
+                  loss='categorical_crossentropy',
+                  metrics=['accuracy'],
+                  # True compiles the train step with XLA; 'auto' leaves it off on CPU
+                  jit_compile=jit_compile)
+    
+    return model
 
-    x = Dense(128, activation='relu')(x)
-    x = BatchNormalization()(x)
-    x = Dropout(0.3)(x)
+def make_throughput_callback(samples_per_epoch):
+    """Keras callback that adds samples_per_second to every epoch's logs"""
+    import time
+    from tensorflow import keras
 
-    x = Dense(64, activation='relu')(x)
-    x = BatchNormalization()(x)
-    x = Dropout(0.2)(x)
+    class ThroughputCallback(keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.started = self.finished = time.perf_counter()
 
-    output = Dense(num_classes, activation='softmax', name="output_layer")(x)
+        def on_train_batch_end(self, batch, logs=None):
+            self.finished = time.perf_counter()
 
-    model = Model(inputs=[numerical_input] + categorical_inputs, outputs=output)
-    model.compile(optimizer=tf.keras.optimizers.AdamW(learning_rate=0.001),
-                  loss='categorical_crossentropy',
-                  metrics=['accuracy'])
-    
-    return model
+        def on_epoch_end(self, epoch, logs=None):
+            # Timed up to the last training batch, so validation is not included
+            seconds = self.finished - self.started
+            if logs is not None and seconds > 0:
+                logs['samples_per_second'] = samples_per_epoch / seconds
 
-def train_model():
-    print("Loading data...")
-    df = pd.read_csv("synthetic_career_data_gan.csv")
+    return ThroughputCallback()
 
-    print("Preparing data...")
-    X_numerical, X_categorical_encoded, y, encoders, target_encoder, scaler, vocab_sizes = prepare_data(df)
+def train_model(csv_path=career_data.DEFAULT_TRAINING_CSV, chunk_size=career_data.DEFAULT_CHUNK_SIZE,
+                batch_size=32, epochs=50, cache_dir=None, hidden_units=DEFAULT_HIDDEN_UNITS,
+                dropout_rates=DEFAULT_DROPOUT_RATES, learning_rate=DEFAULT_LEARNING_RATE,
+                in_memory=False, jit_compile='auto', mixed_precision=False):
+    """Train on csv_path, streamed in chunks or held in memory (see career_data.open_dataset)"""
+    from tensorflow import keras
+    from sklearn.metrics import classification_report, precision_score, recall_score, f1_score
 
-    # Split data
-    X_numerical_train, X_numerical_test, X_categorical_train, X_categorical_test, y_train, y_test = train_test_split(
-        X_numerical, X_categorical_encoded, y, test_size=0.2, random_state=42, stratify=y
-    )
+    print("Loading data...")
+    dataset = career_data.open_dataset(csv_path, chunk_size, cache_dir)
+    preprocessor = dataset.preprocessor
+    print(f"{dataset.num_rows} rows")
+    # Early stopping, the metrics and the NumPy export check all need validation rows
+    if dataset.num_samples('validation') == 0:
+        raise ValueError(f"The validation split of {csv_path} is empty; it needs more rows")
+
+    # Rows are split 80/20 by career_data.split_mask, identically on every pass
+    train_data = dataset.make_dataset(batch_size, subset='training', shuffle=True, in_memory=in_memory)
+    validation_data = dataset.make_dataset(1024, subset='validation', in_memory=in_memory)
 
     # Build model
-    model = build_model(X_numerical.shape[1], vocab_sizes, y.shape[1])
+    model_shape = (len(preprocessor.numerical), preprocessor.vocab_sizes,
+                   preprocessor.num_classes, preprocessor.skill_featurizer.n_features_,
+                   hidden_units, dropout_rates, learning_rate)
+    model = build_model(*model_shape, jit_compile=jit_compile, mixed_precision=mixed_precision)
 
     # Train model with early stopping
     early_stopping = keras.callbacks.EarlyStopping(monitor='val_loss', patience=7, restore_best_weights=True)
 
     print("Training deep learning model...")
     history = model.fit(
-        [X_numerical_train] + [X_categorical_train[:, i] for i in range(X_categorical_train.shape[1])], 
-        y_train,
-        validation_data=(
-            [X_numerical_test] + [X_categorical_test[:, i] for i in range(X_categorical_test.shape[1])], 
-            y_test
-        ),
-        epochs=50,
-        batch_size=32,
-        callbacks=[early_stopping],
+        train_data,
+        validation_data=validation_data,
+        epochs=epochs,
+        callbacks=[make_throughput_callback(dataset.num_samples('training')), early_stopping],
+        # The dataset shuffles its own batches
+        shuffle=False,
         verbose=1
     )
-
-    # Evaluate model
-    y_pred_proba = model.predict([X_numerical_test] + [X_categorical_test[:, i] for i in range(X_categorical_test.shape[1])])
-    y_pred = np.argmax(y_pred_proba, axis=1)
-    y_test_labels = np.argmax(y_test, axis=1)
+    throughput = history.history.get('samples_per_second', [])
+    if throughput:
+        print(f"Training throughput: {np.median(throughput):.0f} samples/s (median over epochs)")
+
+    if mixed_precision:
+        # Same layers and weights computing in float32, as they are served
+        float32_model = build_model(*model_shape)
+        float32_model.set_weights(model.get_weights())
+        model = float32_model
+
+    # Evaluate model batch by batch; only the label vectors are kept
+    y_pred, y_test_labels = [], []
+    parity_inputs = None
+    for X_numerical, X_categorical, X_skills, y in dataset.iter_batches(1024, subset='validation'):
+        test_inputs = build_model_inputs(X_numerical, X_categorical, X_skills)
+        parity_inputs = parity_inputs or test_inputs
+        y_pred.append(np.argmax(model.predict_on_batch(test_inputs), axis=1))
+        y_test_labels.append(y)
+    y_pred = np.concatenate(y_pred)
+    y_test_labels = np.concatenate(y_test_labels)
 
     # Calculate metrics
     precision = precision_score(y_test_labels, y_pred, average='weighted')
@@ -140,57 +173,86 @@ def train_model():
     print(f"Weighted Recall: {recall:.4f}")
     print(f"Weighted F1-Score: {f1:.4f}")
     print("\nDetailed Classification Report:")
-    print(classification_report(y_test_labels, y_pred, target_names=target_encoder.classes_))
+    print(classification_report(y_test_labels, y_pred, labels=np.arange(preprocessor.num_classes),
+                                target_names=preprocessor.classes_, zero_division=0))
 
     # Get test accuracy
-    test_loss, test_accuracy = model.evaluate([X_numerical_test] + [X_categorical_test[:, i] for i in range(X_categorical_test.shape[1])], y_test)
+    test_accuracy = float(np.mean(y_pred == y_test_labels))
     print(f"\nImproved Deep Learning Model Accuracy: {test_accuracy:.4f}")
 
-    # Save model and encoders
+    # Save model and preprocessor
     model.save("career_predictor_dl.keras")
-    joblib.dump({'encoders': encoders, 'target_encoder': target_encoder, 'scaler': scaler}, "career_preprocessors.joblib")
-
-    return model, encoders, target_encoder, scaler, test_accuracy
-
-def predict_career(model, encoders, target_encoder, scaler, input_data):
-    # Rename categorical features in input data
-    column_rename_map = {
-        'Technical_Skills': 'TechnicalSkills',
-        'Soft_Skills': 'SoftSkills',
-        'Academic Background': 'AcademicBackground',
-        'Personality Type': 'PersonalityType',
-        'Work Preference': 'WorkPreference'
-    }
-    input_data.rename(columns=column_rename_map, inplace=True)
-
-    # Define numerical and categorical feature names
-    numerical_features = ['Problem-Solving Score', 'Coding Experience (Years)', 
-                          'Work_Experience', 'Project Experience']
-    categorical_features = list(column_rename_map.values())
-
-    # Scale numerical features
-    X_numerical = scaler.transform(input_data[numerical_features])
-
-    # Encode categorical features
-    X_categorical_encoded = []
-    for feature in categorical_features:
-        encoder = encoders[feature]
-        encoded_feature = encoder.transform([input_data[feature].iloc[0]])
-        X_categorical_encoded.append(encoded_feature)
-
-    # Convert categorical data to NumPy array
-    X_categorical_encoded = np.column_stack(X_categorical_encoded)
-
+    joblib.dump(preprocessor, "career_preprocessor.joblib")
+
+    # Export a TensorFlow-free copy for serving, checked against model.predict
+    from numpy_model import NumpyCareerModel, check_parity, export_numpy_model
+    export_numpy_model(model, "career_predictor_dl.npz")
+    difference = check_parity(model, NumpyCareerModel.load("career_predictor_dl.npz"), parity_inputs)
+    print(f"Exported career_predictor_dl.npz (max abs difference {difference:.2e})")
+
+    return model, preprocessor, test_accuracy
+
+def load_model(model_path="career_predictor_dl.keras", preprocessor_path="career_preprocessor.joblib"):
+    """Load the model and the preprocessor saved by train_model.
+
+    A .npz model_path loads the NumPy export instead (numpy_model), which
+    is scored the same way but never imports TensorFlow.
+    """
+    if model_path.endswith('.npz'):
+        from numpy_model import NumpyCareerModel
+        model = NumpyCareerModel.load(model_path)
+    else:
+        from tensorflow import keras
+        model = keras.models.load_model(model_path)
+    preprocessor = joblib.load(preprocessor_path)
+    return model, preprocessor
+
+def encode_inputs(preprocessor, input_data):
+    """Build the model input list for every row of input_data (left unmodified)"""
+    return build_model_inputs(*preprocessor.transform(input_data))
+
+def predict_proba_batch(model, preprocessor, input_data):
+    """Score all rows with a single direct model call.
+
+    Skips model.predict's per-call dataset and progress bar setup, which
+    dominates when batches are small (see micro_batcher.MicroBatcher).
+    """
+    return np.asarray(model(encode_inputs(preprocessor, input_data), training=False))
+
+def predict_career(model, preprocessor, input_data):
     # Make prediction
-    prediction = model.predict([X_numerical] + [X_categorical_encoded[:, i] for i in range(X_categorical_encoded.shape[1])])
+    prediction = model.predict(encode_inputs(preprocessor, input_data))
     predicted_label = np.argmax(prediction, axis=1)
-    predicted_career = target_encoder.inverse_transform(predicted_label)
+    predicted_career = preprocessor.decode_target(predicted_label)
 
     return predicted_career, prediction
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the deep learning career model")
+    parser.add_argument('--csv', default=career_data.DEFAULT_TRAINING_CSV, help="Training data")
+    parser.add_argument('--chunk-size', type=int, default=career_data.DEFAULT_CHUNK_SIZE,
+                        help="Rows read from the CSV at a time")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--cache-dir', default=None,
+                        help="Compile the CSV into this directory once and memory-map it on later runs")
+    parser.add_argument('--hidden-units', type=int, nargs='+', default=list(DEFAULT_HIDDEN_UNITS))
+    parser.add_argument('--dropout-rates', type=float, nargs='+', default=list(DEFAULT_DROPOUT_RATES),
+                        help="One per hidden layer, or a single rate for all")
+    parser.add_argument('--learning-rate', type=float, default=DEFAULT_LEARNING_RATE)
+    parser.add_argument('--in-memory', action='store_true',
+                        help="Encode the data once and feed batches from memory (fastest when it fits)")
+    parser.add_argument('--jit-compile', action='store_true',
+                        help="Compile the train step with XLA (measure first: it can be slower on CPU)")
+    parser.add_argument('--mixed-precision', action='store_true', help="Train in bfloat16 (mixed_bfloat16)")
+    args = parser.parse_args()
+
     # Train deep learning model
-    model, encoders, target_encoder, scaler, accuracy = train_model()
+    dropout_rates = args.dropout_rates[0] if len(args.dropout_rates) == 1 else args.dropout_rates
+    model, preprocessor, accuracy = train_model(args.csv, args.chunk_size, args.batch_size, args.epochs,
+                                                args.cache_dir, args.hidden_units, dropout_rates,
+                                                args.learning_rate, args.in_memory,
+                                                args.jit_compile or 'auto', args.mixed_precision)
 
     # Example prediction if accuracy is high
     if accuracy >= 0.90:
@@ -207,5 +269,5 @@ if __name__ == "__main__":
             'Work Preference': ['Remote']
         })
 
-        predicted_career, probabilities = predict_career(model, encoders, target_encoder, scaler, example_data)
+        predicted_career, probabilities = predict_career(model, preprocessor, example_data)
         print(f"Predicted Career: {predicted_career[0]}")
@@ -0,0 +1,107 @@
+import json
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import parse_header_links
+
+from sqlite_store import SqliteStore
+
+# Statuses worth remembering: bodies, and "this repo has no README"
+CACHEABLE_STATUSES = (200, 404)
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response served from the cache"""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    @property
+    def links(self):
+        """Parsed Link header, keyed by rel like requests.Response.links"""
+        header = self.headers.get('Link')
+        if not header:
+            return {}
+        return {link.get('rel') or link.get('url'): link for link in parse_header_links(header)}
+
+class ResponseCache:
+    """Persistent SQLite cache of GET responses keyed by full URL.
+
+    Entries younger than ttl seconds are served without touching the
+    network. Older entries are revalidated with If-None-Match /
+    If-Modified-Since; a 304 answer refreshes the entry and does not count
+    against the GitHub rate limit. When the stored bodies exceed max_bytes
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path='github_cache.sqlite', ttl=3600, max_bytes=100 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        # Keyed by URL; the meta holds status, headers and validators
+        self.store = SqliteStore(path, max_bytes)
+
+    def get(self, session, url, params=None, timeout=None):
+        """GET url through the cache using the given requests session"""
+        url = requests.Request('GET', url, params=params).prepare().url
+        entry = self.store.get(url)
+        now = time.time()
+
+        if entry is not None and now - entry[1]['fetched_at'] < self.ttl:
+            self.hits += 1
+            return self._to_response(url, entry)
+
+        # Stale or missing: ask the server, revalidating when we can
+        headers = {}
+        if entry is not None:
+            meta = entry[1]
+            if meta['etag']:
+                headers['If-None-Match'] = meta['etag']
+            if meta['last_modified']:
+                headers['If-Modified-Since'] = meta['last_modified']
+        response = session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            self.store.update_meta(url, dict(entry[1], fetched_at=now))
+            return self._to_response(url, entry)
+
+        self.misses += 1
+        if response.status_code in CACHEABLE_STATUSES:
+            self._store(url, response, now)
+        return response
+
+    def clear(self):
+        self.store.clear()
+
+    def close(self):
+        self.store.close()
+
+    def _store(self, url, response, now):
+        headers = {key: value for key, value in response.headers.items()
+                   if key.lower() in ('content-type', 'etag', 'last-modified', 'link')}
+        self.store.put(url, response.content, {
+            'status': response.status_code,
+            'headers': headers,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': now
+        })
+
+    def _to_response(self, url, entry):
+        body, meta = entry
+        return CachedResponse(url, meta['status'], meta['headers'], body)
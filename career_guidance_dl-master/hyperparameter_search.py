@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import career_data
+from jsonl_file import trim_partial_line
+
+# Values tried per setting; a trial is one random combination
+SEARCH_SPACES = {
+    'hist': {
+        'learning_rate': [0.03, 0.05, 0.1, 0.2],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [10, 20, 50],
+        'l2_regularization': [0.0, 0.1, 1.0]
+    },
+    'gbm': {
+        'learning_rate': [0.05, 0.1, 0.2],
+        'max_depth': [3, 4, 5, 6],
+        'subsample': [0.8, 1.0]
+    },
+    'deep': {
+        'hidden_units': [[256, 128, 64], [128, 64, 32], [512, 256, 128], [256, 128]],
+        'dropout_rates': [0.1, 0.2, 0.3, 0.4],
+        'learning_rate': [0.0003, 0.001, 0.003],
+        'batch_size': [32, 64, 128, 256]
+    }
+}
+# The resource successive halving grows per rung: (setting, smallest, largest)
+BUDGETS = {
+    'hist': ('max_iter', 25, 225),
+    'gbm': ('n_estimators', 25, 225),
+    'deep': ('epochs', 2, 18)
+}
+# Thread pools sized from the environment when their library starts up
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                   'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS']
+
+# Compiled dataset and encoded matrices owned by each worker process
+_dataset = None
+_matrices = {}
+
+def _init_worker(cache_dir, threads):
+    global _dataset
+    # Set before sklearn's OpenMP runtime or TensorFlow load in this process,
+    # so concurrent trials share the cores instead of each claiming all of them
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    from threadpoolctl import threadpool_limits
+    # numpy's BLAS is already loaded
+    threadpool_limits(threads)
+    _dataset = career_data.CompiledDataset(cache_dir)
+
+def _boosting_matrices(engine):
+    """Training and validation matrices for engine, encoded once per worker"""
+    if engine not in _matrices:
+        import career_predictor_simple
+
+        _matrices[engine] = tuple(
+            career_predictor_simple.load_training_data(engine=engine, dataset=_dataset, subset=subset)[:2]
+            for subset in ('training', 'validation')
+        )
+    return _matrices[engine]
+
+def _boosting_trial(engine, params, budget):
+    import career_predictor_simple
+
+    (X_train, y_train), (X_validation, y_validation) = _boosting_matrices(engine)
+    params = dict(params, **{BUDGETS[engine][0]: budget})
+    model = career_predictor_simple.build_estimator(engine, _dataset.preprocessor, params)
+    model.fit(X_train, y_train)
+    return float(np.mean(model.predict(X_validation) == y_validation))
+
+def _deep_trial(params, budget):
+    from tensorflow import keras
+    import hh
+
+    preprocessor = _dataset.preprocessor
+    model = hh.build_model(len(preprocessor.numerical), preprocessor.vocab_sizes, preprocessor.num_classes,
+                           preprocessor.skill_featurizer.n_features_, params['hidden_units'],
+                           params['dropout_rates'], params['learning_rate'])
+    model.fit(_dataset.make_dataset(params['batch_size'], subset='training', shuffle=True),
+              epochs=budget, shuffle=False, verbose=0)
+    _, accuracy = model.evaluate(_dataset.make_dataset(1024, subset='validation'), verbose=0)
+    # Free the graph before this worker's next trial
+    keras.backend.clear_session()
+    return float(accuracy)
+
+def _run_trial(kind, params, budget):
+    """Worker entry point: validation accuracy, or the error, plus seconds taken"""
+    start = time.perf_counter()
+    try:
+        if kind == 'deep':
+            result = {'score': _deep_trial(params, budget)}
+        else:
+            result = {'score': _boosting_trial(kind, params, budget)}
+    except Exception as e:
+        result = {'score': None, 'error': f"{type(e).__name__}: {e}"}
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+def sample_configs(space, num_trials, seed=42):
+    """num_trials distinct random combinations of space (all of them if it is smaller)"""
+    rng = random.Random(seed)
+    names = sorted(space)
+    size = 1
+    for name in names:
+        size *= len(space[name])
+    configs, seen = [], set()
+    while len(configs) < min(num_trials, size):
+        config = {name: rng.choice(space[name]) for name in names}
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+class ResultStore:
+    """Trial results appended to a JSON Lines file, so an interrupted search resumes.
+
+    Results are keyed by model kind, settings, budget and the dataset's
+    preprocessor digest; a restarted search only runs the trials missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        # add() appends, so first drop a line the interruption left half-written
+        trim_partial_line(path)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A garbled line; its trial simply runs again
+                        continue
+                    self.results[self.key(record['kind'], record['params'], record['budget'],
+                                          record['dataset'])] = record
+
+    @staticmethod
+    def key(kind, params, budget, dataset):
+        return json.dumps([kind, params, budget, dataset], sort_keys=True)
+
+    def get(self, kind, params, budget, dataset):
+        return self.results.get(self.key(kind, params, budget, dataset))
+
+    def add(self, record):
+        self.results[self.key(record['kind'], record['params'], record['budget'], record['dataset'])] = record
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record) + '\n')
+
+def successive_halving(configs, run_rung, min_budget, max_budget, eta=3):
+    """Run every config at min_budget, keep the best 1/eta, multiply the budget by eta, repeat.
+
+    run_rung(configs, budget) returns one record per config. Returns the
+    records of the last rung, best first.
+    """
+    survivors, budget = configs, min_budget
+    while True:
+        records = run_rung(survivors, budget)
+        ranked = sorted(records, key=lambda record: -1.0 if record['score'] is None else record['score'],
+                        reverse=True)
+        if budget >= max_budget or len(ranked) == 1:
+            return ranked
+        survivors = [record['params'] for record in ranked[:max(1, len(ranked) // eta)]]
+        budget = min(budget * eta, max_budget)
+
+def search(kind, csv_path=career_data.DEFAULT_TRAINING_CSV, chunk_size=career_data.DEFAULT_CHUNK_SIZE,
+           cache_dir=None, num_trials=27, eta=3, min_budget=None, max_budget=None, workers=None,
+           threads=None, results_path=None, seed=42, progress=None):
+    """Successive-halving search over SEARCH_SPACES[kind] across a process pool.
+
+    The CSV is compiled into cache_dir once (career_data.open_dataset) and
+    every worker memory-maps it. Each worker is limited to threads threads
+    (default: the cores divided among the workers). Finished trials are
+    appended to results_path and skipped when the search is run again.
+    Returns the final rung's records, best first.
+    """
+    _, default_min, default_max = BUDGETS[kind]
+    min_budget = min_budget or default_min
+    max_budget = max_budget or default_max
+    cache_dir = cache_dir or csv_path + '.compiled'
+    workers = workers or os.cpu_count() or 1
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    store = ResultStore(results_path or f"search_{kind}.jsonl")
+
+    dataset = career_data.open_dataset(csv_path, chunk_size, cache_dir)
+    digest = dataset.preprocessor.digest()
+    configs = sample_configs(SEARCH_SPACES[kind], num_trials, seed)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_dir, threads)) as executor:
+
+        def run_rung(rung_configs, budget):
+            records, futures = [], {}
+            for params in rung_configs:
+                record = store.get(kind, params, budget, digest)
+                if record is not None:
+                    records.append(record)
+                else:
+                    futures[executor.submit(_run_trial, kind, params, budget)] = params
+            for future in as_completed(futures):
+                record = dict(future.result(), kind=kind, params=futures[future], budget=budget,
+                              dataset=digest)
+                store.add(record)
+                records.append(record)
+                if progress is not None:
+                    progress(record)
+            return records
+
+        return successive_halving(configs, run_rung, min_budget, max_budget, eta)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parallel successive-halving hyperparameter search for the career models")
+    parser.add_argument('kind', choices=sorted(SEARCH_SPACES),
+                        help="hist / gbm: career_predictor_simple engines; deep: the hh network")
+    parser.add_argument('--csv', default=career_data.DEFAULT_TRAINING_CSV)
+    parser.add_argument('--chunk-size', type=int, default=career_data.DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--cache-dir', default=None,
+                        help="Compiled dataset shared by all trials (default: the CSV path + .compiled)")
+    parser.add_argument('--trials', type=int, default=27, help="Configurations in the first rung")
+    parser.add_argument('--eta', type=int, default=3, help="Keep 1/eta of the trials per rung")
+    parser.add_argument('--min-budget', type=int, default=None, help="Boosting rounds or epochs of the first rung")
+    parser.add_argument('--max-budget', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help="Trials run at once (default: CPU count)")
+    parser.add_argument('--threads', type=int, default=None,
+                        help="Threads per trial (default: CPU count / workers)")
+    parser.add_argument('--results', default=None, help="JSON Lines results file (default: search_<kind>.jsonl)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    def report(record):
+        outcome = record['error'] if record['score'] is None else f"accuracy {record['score']:.4f}"
+        print(f"budget {record['budget']:>4}  {outcome}  ({record['seconds']:.1f}s)  "
+              f"{json.dumps(record['params'], sort_keys=True)}")
+
+    ranked = search(args.kind, args.csv, args.chunk_size, args.cache_dir, args.trials, args.eta,
+                    args.min_budget, args.max_budget, args.workers, args.threads, args.results,
+                    args.seed, report)
+    best = ranked[0]
+    if best['score'] is None:
+        print(f"\nEvery trial failed, e.g. {best['error']}")
+        return
+    settings = dict(best['params'], **{BUDGETS[args.kind][0]: best['budget']})
+    print(f"\nBest validation accuracy {best['score']:.4f} with {json.dumps(settings, sort_keys=True)}")
+
+if __name__ == "__main__":
+    main()
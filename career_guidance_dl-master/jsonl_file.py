@@ -0,0 +1,25 @@
+import os
+
+def trim_partial_line(path, block_size=64 * 1024):
+    """Cut a JSON Lines file back to its last complete line; returns the bytes dropped.
+
+    A run killed mid-write leaves a truncated last line, and appending to
+    it would glue the next record onto it. Call before opening in 'a' mode.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as file:
+        size = file.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - block_size)
+            file.seek(start)
+            block = file.read(end - start)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            file.truncate(end)
+        return size - end
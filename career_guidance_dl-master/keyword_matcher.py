@@ -0,0 +1,65 @@
+import re
+from collections import Counter
+
+class KeywordMatcher:
+    """Finds every keyword of a taxonomy in one scan of the text.
+
+    Built from (keyword, name, category) entries: all keywords are compiled
+    into a single alternation (longest first, so 'express.js' wins over
+    'express') guarded by word boundaries, so 'go' no longer matches inside
+    'google'. Keywords and text are lower-cased instead of using
+    re.IGNORECASE, which is several times slower on a large alternation.
+    Keywords listed in case_sensitive (short ones that are also English
+    words, like 'Go') only match as written, in a second, small scan.
+    Matches are mapped back to their canonical names through a dict, and
+    each name keeps the categories it belongs to.
+    """
+
+    def __init__(self, entries, case_sensitive=()):
+        case_sensitive = set(case_sensitive)
+        self._names = {}
+        self._exact_names = {}
+        self._categories = {}
+        for keyword, name, category in entries:
+            if keyword in case_sensitive:
+                names = self._exact_names.setdefault(keyword, [])
+            else:
+                names = self._names.setdefault(keyword.lower(), [])
+            if name not in names:
+                names.append(name)
+            categories = self._categories.setdefault(name, [])
+            if category not in categories:
+                categories.append(category)
+
+        self._pattern = self._compile(self._names)
+        self._exact_pattern = self._compile(self._exact_names)
+
+    @staticmethod
+    def _compile(keywords):
+        if not keywords:
+            return None
+        keywords = sorted(keywords, key=len, reverse=True)
+        # \b does not work around symbols like 'c#' or 'node.js', so use lookarounds
+        return re.compile(
+            r'(?<!\w)(?:' + '|'.join(re.escape(keyword) for keyword in keywords) + r')(?!\w)'
+        )
+
+    def count(self, text):
+        """Counter of canonical names -> number of keyword hits in text"""
+        counts = Counter()
+        for pattern, names, scanned in ((self._pattern, self._names, text.lower()),
+                                        (self._exact_pattern, self._exact_names, text)):
+            if pattern is None:
+                continue
+            for match in pattern.finditer(scanned):
+                for name in names[match.group()]:
+                    counts[name] += 1
+        return counts
+
+    def find(self, text):
+        """Set of canonical names mentioned in text"""
+        return set(self.count(text))
+
+    def categories_of(self, name):
+        """Categories a canonical name belongs to (empty if unknown)"""
+        return self._categories.get(name, [])
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into batched model calls.
+
+    Requests are queued and collected until either max_batch_size rows are
+    waiting or max_latency_ms has passed since the first one arrived. The
+    whole batch is then handed to predict_batch (a callable taking a list of
+    rows and returning one result per row), which runs on a single worker
+    thread so the model is never called concurrently. Results or the raised
+    exception are fanned back out to each caller.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_latency_ms=5):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self._queue = None
+        self._worker = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='micro-batcher')
+        self.batches_run = 0
+        self.rows_run = 0
+
+    async def start(self):
+        """Start the collector task on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop collecting; requests still queued are cancelled"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, row):
+        """Queue one row and wait for its result"""
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        """Wait for the first request, then gather more until size or time runs out"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Callers that gave up (e.g. timed out) are dropped from the batch
+            batch = [(row, future) for row, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            rows = [row for row, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_batch, rows)
+                # A short result list would leave the unmatched callers waiting forever
+                if len(results) != len(rows):
+                    raise ValueError(f"predict_batch returned {len(results)} results for {len(rows)} rows")
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.rows_run += len(rows)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+class BackgroundMicroBatcher:
+    """Runs a MicroBatcher on its own event loop thread for synchronous callers
+    such as the threaded prediction server."""
+
+    def __init__(self, predict_batch, max_batch_size=64, max_latency_ms=5):
+        self.batcher = MicroBatcher(predict_batch, max_batch_size, max_latency_ms)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='micro-batcher-loop',
+                                        daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.batcher.start(), self._loop).result()
+
+    def predict(self, row, timeout=None):
+        """Submit one row from any thread and block until its result is ready"""
+        return asyncio.run_coroutine_threadsafe(self.batcher.predict(row), self._loop).result(timeout)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.batcher.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
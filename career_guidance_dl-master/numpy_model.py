@@ -0,0 +1,174 @@
+import argparse
+
+import numpy as np
+
+# Layers that only matter during training, or are implied by the forward pass
+PASSTHROUGH_LAYERS = {'InputLayer', 'Dropout', 'Flatten', 'Concatenate'}
+
+def _relu(x):
+    return np.maximum(x, 0)
+
+def _softmax(x):
+    x = x - x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+def _linear(x):
+    return x
+
+ACTIVATIONS = {'relu': _relu, 'softmax': _softmax, 'linear': _linear}
+
+def _batch_norm_affine(layer):
+    """(scale, shift) such that BatchNormalization(x) == x * scale + shift at inference"""
+    weights = iter(layer.get_weights())
+    gamma = next(weights) if layer.scale else None
+    beta = next(weights) if layer.center else None
+    mean, variance = next(weights), next(weights)
+    scale = 1 / np.sqrt(variance + layer.epsilon)
+    if gamma is not None:
+        scale = scale * gamma
+    shift = -mean * scale
+    if beta is not None:
+        shift = shift + beta
+    return scale, shift
+
+def fold_model(model):
+    """Extract an hh.build_model network as plain arrays.
+
+    Returns (input_names, embeddings, dense_layers): embeddings maps each
+    categorical input name to its table, and dense_layers is the chain of
+    (kernel, bias, activation) after the concatenation. Dropout is dropped.
+    Each BatchNormalization sits after a ReLU, so it cannot be folded into
+    the Dense before it; it is folded into the Dense that follows instead:
+    (x * s + t) @ W + b == x @ (s[:, None] * W) + (t @ W + b).
+    """
+    input_names = [tensor.name for tensor in model.inputs]
+    embeddings = {}
+    dense_layers = []
+    pending = None
+
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'Embedding':
+            # build_model names each embedding after its input
+            input_name = layer.name[:-len('_embedding')] + '_input'
+            embeddings[input_name] = layer.get_weights()[0]
+        elif kind == 'Dense':
+            kernel, bias = layer.get_weights()
+            if pending is not None:
+                scale, shift = pending
+                bias = bias + shift @ kernel
+                kernel = scale[:, None] * kernel
+                pending = None
+            dense_layers.append((kernel, bias, layer.activation.__name__))
+        elif kind == 'BatchNormalization':
+            if pending is not None:
+                raise ValueError("Two BatchNormalization layers in a row are not supported")
+            pending = _batch_norm_affine(layer)
+        elif kind not in PASSTHROUGH_LAYERS:
+            raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+
+    if pending is not None:
+        # A trailing BatchNormalization becomes a diagonal linear layer
+        scale, shift = pending
+        dense_layers.append((np.diag(scale), shift, 'linear'))
+    for _, _, activation in dense_layers:
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation: {activation}")
+    return input_names, embeddings, dense_layers
+
+def export_numpy_model(model, path="career_predictor_dl.npz"):
+    """Save a trained hh model as a NumpyCareerModel .npz file"""
+    input_names, embeddings, dense_layers = fold_model(model)
+    arrays = {
+        'input_names': np.array(input_names),
+        'activations': np.array([activation for _, _, activation in dense_layers])
+    }
+    for name, table in embeddings.items():
+        arrays[f'embedding:{name}'] = table.astype(np.float32)
+    for i, (kernel, bias, _) in enumerate(dense_layers):
+        arrays[f'kernel:{i}'] = kernel.astype(np.float32)
+        arrays[f'bias:{i}'] = bias.astype(np.float32)
+    np.savez(path, **arrays)
+    return path
+
+class NumpyCareerModel:
+    """Inference-only forward pass of an exported hh model, in plain NumPy.
+
+    Called like the Keras model, with the input list from
+    hh.build_model_inputs, so hh.predict_proba_batch serves it unchanged.
+    Holds a few hundred KB of weights and needs no TensorFlow. Unlike a
+    Keras model, it is safe to call from several threads at once.
+    """
+
+    def __init__(self, input_names, embeddings, dense_layers):
+        self.input_names = list(input_names)
+        self.embeddings = embeddings
+        self.dense_layers = [(kernel, bias, ACTIVATIONS[activation])
+                             for kernel, bias, activation in dense_layers]
+
+    @classmethod
+    def from_keras(cls, model):
+        return cls(*fold_model(model))
+
+    @classmethod
+    def load(cls, path="career_predictor_dl.npz"):
+        with np.load(path, allow_pickle=False) as data:
+            input_names = [str(name) for name in data['input_names']]
+            embeddings = {name: data[f'embedding:{name}'] for name in input_names
+                          if f'embedding:{name}' in data}
+            dense_layers = [(data[f'kernel:{i}'], data[f'bias:{i}'], str(activation))
+                            for i, activation in enumerate(data['activations'])]
+        return cls(input_names, embeddings, dense_layers)
+
+    def __call__(self, inputs, training=False):
+        # Numerical and skill inputs pass through; categorical codes are looked up
+        parts = []
+        for name, values in zip(self.input_names, inputs):
+            if name in self.embeddings:
+                codes = np.asarray(values).reshape(-1).astype(np.intp)
+                parts.append(self.embeddings[name][codes])
+            else:
+                parts.append(np.asarray(values, dtype=np.float32))
+        x = np.concatenate(parts, axis=1)
+        for kernel, bias, activation in self.dense_layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+    def predict(self, inputs, batch_size=None, verbose=0):
+        return self(inputs)
+
+def check_parity(model, numpy_model, inputs, atol=1e-4):
+    """Largest absolute probability difference against model.predict; raises past atol"""
+    expected = model.predict(inputs, verbose=0)
+    actual = numpy_model(inputs)
+    difference = float(np.max(np.abs(expected - actual)))
+    if difference > atol or not np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1)):
+        raise AssertionError(f"NumPy export differs from the Keras model (max abs diff {difference:.2e})")
+    return difference
+
+def main():
+    import pandas as pd
+    import hh
+
+    parser = argparse.ArgumentParser(description="Export the hh Keras model to a NumPy forward pass")
+    parser.add_argument('--model', default='career_predictor_dl.keras')
+    parser.add_argument('--preprocessor', default='career_preprocessor.joblib')
+    parser.add_argument('-o', '--output', default='career_predictor_dl.npz')
+    parser.add_argument('--check-csv', default='realistic_career_data.csv',
+                        help="Rows to compare against model.predict after exporting")
+    parser.add_argument('--check-rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    model, preprocessor = hh.load_model(args.model, args.preprocessor)
+    export_numpy_model(model, args.output)
+    print(f"Exported {args.model} to {args.output}")
+
+    rows = pd.read_csv(args.check_csv, nrows=args.check_rows)
+    inputs = hh.encode_inputs(preprocessor, rows)
+    difference = check_parity(model, NumpyCareerModel.load(args.output), inputs)
+    print(f"Parity check on {len(rows)} rows: max abs difference {difference:.2e}")
+
+if __name__ == "__main__":
+    main()
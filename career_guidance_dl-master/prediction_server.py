@@ -0,0 +1,183 @@
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from career_preprocessor import NUMERICAL_FEATURES, features_to_frame, rows_to_frame, validate_record
+from micro_batcher import BackgroundMicroBatcher
+
+class SimplePredictor:
+    """Serves the gradient boosting bundle from career_predictor_simple"""
+
+    def __init__(self, model_path='career_predictor_simple.joblib'):
+        import career_predictor_simple
+
+        self._module = career_predictor_simple
+        self.model_data = career_predictor_simple.load_model(model_path)
+        self.classes = list(self.model_data['preprocessor'].classes_)
+
+    def predict_proba(self, input_data):
+        _, probabilities = self._module.predict_career_batch(self.model_data, input_data)
+        return probabilities
+
+class DeepPredictor:
+    """Serves the hh model (Keras, or its NumPy export) and its preprocessor"""
+
+    def __init__(self, model_path='career_predictor_dl.keras',
+                 preprocessor_path='career_preprocessor.joblib'):
+        import hh
+
+        self._module = hh
+        self.model, self.preprocessor = hh.load_model(model_path, preprocessor_path)
+        self.classes = list(self.preprocessor.classes_)
+        # Keras models are not safe to call from several threads at once;
+        # the NumPy export is, so it skips the lock
+        self._lock = threading.Lock() if not model_path.endswith('.npz') else None
+
+    def predict_proba(self, input_data):
+        if self._lock is None:
+            return self._module.predict_proba_batch(self.model, self.preprocessor, input_data)
+        with self._lock:
+            return self._module.predict_proba_batch(self.model, self.preprocessor, input_data)
+
+def format_predictions(classes, probabilities):
+    """Build one JSON-friendly result per row of probabilities"""
+    results = []
+    for row in probabilities:
+        best = int(np.argmax(row))
+        results.append({
+            'predicted_career': classes[best],
+            'confidence': round(float(row[best]), 4),
+            'probabilities': {career: round(float(p), 4) for career, p in zip(classes, row)}
+        })
+    return results
+
+class PredictionService:
+    """Holds a warm predictor and answers single and batch requests.
+
+    With micro_batch enabled, concurrent single-row requests are coalesced
+    by a BackgroundMicroBatcher into one model call per batch.
+    """
+
+    def __init__(self, predictor, micro_batch=False, max_batch_size=64, max_latency_ms=5):
+        self.predictor = predictor
+        self.batcher = None
+        if micro_batch:
+            self.batcher = BackgroundMicroBatcher(self._predict_rows, max_batch_size, max_latency_ms)
+
+    def _predict_rows(self, rows):
+        return self.predictor.predict_proba(rows_to_frame(rows))
+
+    def warm_up(self):
+        # The first call pays for graph tracing / lazy initialisation
+        self.predict_batch([{feature: 0 for feature in NUMERICAL_FEATURES}])
+
+    def predict_batch(self, records):
+        if not records:
+            return []
+        probabilities = self.predictor.predict_proba(features_to_frame(records))
+        return format_predictions(self.predictor.classes, probabilities)
+
+    def predict_one(self, record):
+        if self.batcher is None:
+            return self.predict_batch([record])[0]
+        probabilities = self.batcher.predict(validate_record(record))
+        return format_predictions(self.predictor.classes, [probabilities])[0]
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """Routes: GET /health, POST /predict, POST /predict/batch"""
+
+    service = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'classes': self.service.predictor.classes})
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'null')
+
+            if self.path == '/predict':
+                # Accept either the bare model_features dict or a full analyzer result
+                if isinstance(payload, dict) and 'model_features' in payload:
+                    payload = payload['model_features']
+                self._send_json(200, self.service.predict_one(payload))
+            elif self.path == '/predict/batch':
+                records = payload.get('instances') if isinstance(payload, dict) else payload
+                if not isinstance(records, list):
+                    raise ValueError("Expected a JSON list of model_features objects")
+                records = [record.get('model_features', record) if isinstance(record, dict) else record
+                           for record in records]
+                self._send_json(200, {'predictions': self.service.predict_batch(records)})
+            else:
+                self._send_json(404, {'error': f"Unknown path {self.path}"})
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 resets connections under concurrent load
+    request_queue_size = 128
+    daemon_threads = True
+
+def create_server(service, host='127.0.0.1', port=8000):
+    """Create (but do not start) an HTTP server bound to a warm service"""
+    handler = type('BoundPredictionRequestHandler', (PredictionRequestHandler,), {'service': service})
+    return PredictionHTTPServer((host, port), handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve career predictions over HTTP")
+    parser.add_argument('--engine', choices=['simple', 'dl'], default='simple')
+    parser.add_argument('--model', help="Model file (.joblib for simple, .keras or exported .npz for dl)")
+    parser.add_argument('--preprocessor', default='career_preprocessor.joblib',
+                        help="Saved CareerPreprocessor for the dl engine")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--micro-batch', action='store_true',
+                        help="Coalesce concurrent /predict requests into batched model calls")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-latency-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"Loading {args.engine} model...")
+    if args.engine == 'simple':
+        predictor = SimplePredictor(args.model or 'career_predictor_simple.joblib')
+    else:
+        predictor = DeepPredictor(args.model or 'career_predictor_dl.keras', args.preprocessor)
+
+    service = PredictionService(predictor, args.micro_batch, args.max_batch_size, args.max_latency_ms)
+    service.warm_up()
+
+    server = create_server(service, args.host, args.port)
+    print(f"Serving predictions on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
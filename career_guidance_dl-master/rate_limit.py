@@ -0,0 +1,141 @@
+import random
+import threading
+import time
+
+import requests
+
+# Never let the derived refill rate reach zero (that would wait forever)
+MIN_RATE = 1 / 60
+
+def is_rate_limited(response):
+    """True if GitHub rejected the request for rate-limit reasons"""
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
+    )
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request of a bulk run.
+
+    The refill rate starts from requests_per_hour and is re-derived from
+    X-RateLimit-Remaining / X-RateLimit-Reset on every response, spreading
+    the remaining budget evenly over the rest of the window. An exhausted
+    budget or a Retry-After header blocks all callers until the server says
+    requests may resume; once an exhausted budget resets, the full rate
+    (X-RateLimit-Limit per hour if seen, else requests_per_hour) and burst
+    are restored.
+    """
+
+    def __init__(self, requests_per_hour=5000, burst=50):
+        self.full_rate = max(requests_per_hour / 3600, MIN_RATE)
+        self.rate = self.full_rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        # When the exhausted budget comes back (0 while it is not exhausted)
+        self.reset_at = 0.0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until one request may be sent"""
+        with self._cond:
+            while True:
+                blocked_for = self.blocked_until - time.time()
+                if blocked_for > 0:
+                    wait = blocked_for
+                else:
+                    if self.reset_at and time.time() >= self.reset_at:
+                        self._restore()
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                # Woken early by update() when the server changes the budget
+                self._cond.wait(min(wait, 60))
+
+    def _restore(self):
+        # A new window: the derived rate and the drained bucket no longer apply
+        self.reset_at = 0.0
+        self.rate = self.full_rate
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def refund(self):
+        """Return a token for a request that did not count (e.g. a 304)"""
+        with self._cond:
+            self.tokens = min(self.capacity, self.tokens + 1)
+            self._cond.notify()
+
+    def update(self, response):
+        """Re-derive the budget from GitHub's rate-limit headers"""
+        headers = response.headers
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        retry_after = headers.get('Retry-After')
+        limit = headers.get('X-RateLimit-Limit')
+        with self._cond:
+            if limit is not None:
+                self.full_rate = max(int(limit) / 3600, MIN_RATE)
+            if remaining is not None and reset is not None:
+                remaining, reset = int(remaining), float(reset)
+                window = max(reset - time.time(), 1)
+                self.rate = max(remaining / window, MIN_RATE)
+                self._refill()
+                self.tokens = min(self.tokens, remaining)
+                if remaining == 0:
+                    self.blocked_until = max(self.blocked_until, reset + 1)
+                    self.reset_at = max(self.reset_at, reset + 1)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, time.time() + float(retry_after))
+            self._cond.notify_all()
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that waits on a RateLimiter and retries with backoff.
+
+    Rate-limited responses (429, or 403 with an exhausted budget or a
+    Retry-After header), 5xx responses and connection errors are retried
+    up to max_retries times; the last response is returned if they persist.
+    """
+
+    def __init__(self, rate_limiter, max_retries=5, backoff=1.0, max_backoff=60):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _sleep_before_retry(self, attempt):
+        # Exponential backoff with jitter; rate-limit blocks are handled by acquire()
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        time.sleep(delay * (0.5 + random.random() / 2))
+
+    def request(self, method, url, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._sleep_before_retry(attempt)
+                continue
+
+            self.rate_limiter.update(response)
+            if response.status_code == 304:
+                # Conditional hits do not count against the GitHub budget
+                self.rate_limiter.refund()
+
+            rate_limited = is_rate_limited(response)
+            if (rate_limited or response.status_code >= 500) and attempt < self.max_retries:
+                if not (rate_limited and self.rate_limiter.blocked_until > time.time()):
+                    self._sleep_before_retry(attempt)
+                continue
+            return response
@@ -1,10 +1,53 @@
 import re
+import io
+import hashlib
 import PyPDF2
 from pathlib import Path
 import json
+from resume_cache import ResumeCache, hash_bytes
+from skill_taxonomy import get_taxonomy_loader
+from skill_strings import join_skills
+
+# Bump whenever extract_features changes behaviour, so cached features are recomputed
+FEATURE_EXTRACTOR_VERSION = 2
+
+# Project-score indicators, matched against the lowercased text
+PROJECT_INDICATORS = {
+    'project': r'project|developed|created|built|implemented',
+    'hackathon': r'hackathon|competition|contest',
+    'team': r'team|collaborated|led',
+    'award': r'won|winner|award|place',
+}
+
+NUMBER_PATTERN = re.compile(r'\d+')
+DECIMAL_PATTERN = re.compile(r'[0-9]+\.[0-9]+')
+
+def lowercase_pattern(pattern):
+    """Lower-case a regex's literals, leaving escapes such as \\D or \\S untouched"""
+    parts = re.split(r'(\\.)', pattern)
+    return ''.join(part if part.startswith('\\') else part.lower() for part in parts)
+
+def lower_same_length(text):
+    """text.lower(), keeping every character in place so match offsets stay valid"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # 'İ' lower-cases to two characters; keep only the first ('i'), as re.IGNORECASE does
+    return ''.join(char.lower()[0] for char in text)
 
 class ResumeAnalyzer:
-    def __init__(self):
+    def __init__(self, cache=None, max_pages=None, required_fields=None, taxonomy=None):
+        # Optional resume_cache.ResumeCache for extracted text and features
+        self.cache = cache
+        # Technical and soft skills come from the shared, hot-reloaded skill taxonomy
+        self.taxonomy = taxonomy or get_taxonomy_loader()
+        # Pages after max_pages are ignored, bounding work on oversized uploads
+        self.max_pages = max_pages
+        # Dotted feature paths (e.g. 'education.major', 'experience_years');
+        # uncached analysis stops reading pages once all of them are found
+        self.required_fields = list(required_fields) if required_fields else []
+        self.check_required_fields(self.required_fields, cached=cache is not None)
+        
         # Define patterns for feature extraction
         self.patterns = {
             'education': {
@@ -12,14 +55,6 @@ class ResumeAnalyzer:
                 'major': r'Computer Science|Engineering|Information Technology|Data Science|AI|ML',
                 'gpa': r'[0-9]+\.[0-9]+\s*(?:CGPA|GPA|CPI)',
             },
-            'technical_skills': {
-                'programming': r'Python|Java|C\+\+|JavaScript|TypeScript|HTML|CSS|SQL',
-                'frameworks': r'React|Angular|Vue|Django|Flask|Spring|Express|Node\.js',
-                'ml_tools': r'TensorFlow|PyTorch|Scikit-learn|Keras|Pandas|NumPy',
-                'databases': r'MySQL|MongoDB|PostgreSQL|SQLite|Redis',
-                'devops': r'Docker|Kubernetes|AWS|Azure|GCP|Git',
-            },
-            'soft_skills': r'Leadership|Communication|Team Player|Problem.Solving|Analytical|Critical Thinking|Time Management',
             'project_keywords': r'Machine Learning|Deep Learning|Web Development|Full Stack|Database|API|Algorithm|System Design',
             'experience': r'\d+\+?\s*(?:year|yr|month)s?\s*(?:of experience)?',
         }
@@ -33,42 +68,108 @@ class ResumeAnalyzer:
             'team': 1,
             'award': 2,
         }
+        
+        self.compile_patterns()
+
+    def compile_patterns(self):
+        """Compile self.patterns once (call again after editing them).
+
+        Case-insensitive patterns are rewritten in lower case and matched
+        case-sensitively against a lowercased copy of the text, which is
+        several times faster than re.IGNORECASE; matches are sliced from
+        the original text so they keep their case. GPA was always matched
+        case-sensitively and still runs on the original text.
+        """
+        patterns = {}
+        for edu_type, pattern in self.patterns['education'].items():
+            if edu_type != 'gpa':
+                patterns[f'education_{edu_type}'] = pattern
+        patterns['project_keywords'] = self.patterns['project_keywords']
+        patterns['experience'] = self.patterns['experience']
+        
+        self._compiled = {name: re.compile(lowercase_pattern(pattern))
+                          for name, pattern in patterns.items()}
+        self._gpa_pattern = re.compile(self.patterns['education']['gpa'])
+        self._indicator_patterns = {name: re.compile(pattern)
+                                    for name, pattern in PROJECT_INDICATORS.items()}
+        # What the regexes above were built from, for pattern_version: edits
+        # to self.patterns do not count until they are compiled
+        self._compiled_from = json.dumps({'patterns': self.patterns, 'project_indicators': PROJECT_INDICATORS},
+                                         sort_keys=True)
+
+    def scan(self, text, taxonomy=None):
+        """All matches of every pattern in text: name -> list of matched strings.
+
+        With a SkillTaxonomy, 'skills' holds the canonical skill names found.
+        """
+        lowered = lower_same_length(text)
+        matches = {name: [text[match.start():match.end()] for match in regex.finditer(lowered)]
+                   for name, regex in self._compiled.items()}
+        gpa_match = self._gpa_pattern.search(text)
+        matches['education_gpa'] = [gpa_match.group()] if gpa_match else []
+        matches['project_counts'] = {name: len(regex.findall(lowered))
+                                     for name, regex in self._indicator_patterns.items()}
+        if taxonomy is not None:
+            # Original case, for the case-sensitive aliases (e.g. Go)
+            matches['skills'] = taxonomy.find(text)
+        return matches
+
+    @property
+    def pattern_version(self):
+        """Fingerprint of everything extract_features depends on"""
+        config = json.dumps({
+            'compiled': self._compiled_from,
+            'project_scoring': self.project_scoring,
+            'taxonomy': self.taxonomy.get().digest,
+            'extractor_version': FEATURE_EXTRACTOR_VERSION,
+            'max_pages': self.max_pages
+        }, sort_keys=True)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+    def iter_pdf_pages(self, file):
+        """Yield the text of each page of an open PDF, up to max_pages.
+
+        Pages are parsed lazily, so a consumer that stops early never pays
+        for the remaining pages.
+        """
+        pdf_reader = PyPDF2.PdfReader(file)
+        pages = pdf_reader.pages
+        if self.max_pages is not None:
+            pages = pages[:self.max_pages]
+        for page in pages:
+            yield page.extract_text() or ''
 
     def extract_text_from_pdf(self, pdf_path):
-        """Extract text from PDF file"""
+        """Extract text from PDF file (a path or a binary file object)"""
         try:
+            if hasattr(pdf_path, 'read'):
+                return self._read_pdf_text(pdf_path)
             with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ''
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + '\n'
-                return text
+                return self._read_pdf_text(file)
         except Exception as e:
             return f"Error reading PDF: {str(e)}"
 
-    def calculate_project_score(self, text):
-        """Calculate project experience score (1-10)"""
+    def _read_pdf_text(self, file):
+        # One join instead of repeated concatenation, which is quadratic on long documents
+        return ''.join(page + '\n' for page in self.iter_pdf_pages(file))
+
+    def _score_project_counts(self, counts):
         score = 0
-        text_lower = text.lower()
-        
-        # Count project indicators
-        project_count = len(re.findall(r'project|developed|created|built|implemented', text_lower))
-        hackathon_count = len(re.findall(r'hackathon|competition|contest', text_lower))
-        team_count = len(re.findall(r'team|collaborated|led', text_lower))
-        award_count = len(re.findall(r'won|winner|award|place', text_lower))
-        
-        # Calculate base score
-        score += min(project_count * self.project_scoring['development'], 4)
-        score += min(hackathon_count * self.project_scoring['hackathon'], 3)
-        score += min(team_count * self.project_scoring['team'], 2)
-        score += min(award_count * self.project_scoring['award'], 1)
+        score += min(counts['project'] * self.project_scoring['development'], 4)
+        score += min(counts['hackathon'] * self.project_scoring['hackathon'], 3)
+        score += min(counts['team'] * self.project_scoring['team'], 2)
+        score += min(counts['award'] * self.project_scoring['award'], 1)
         
         return min(max(round(score), 1), 10)
 
-    def extract_features(self, text):
-        """Extract relevant features from resume text"""
-        text = text.replace('\n', ' ')
-        features = {
+    def calculate_project_score(self, text):
+        """Calculate project experience score (1-10)"""
+        return self._score_project_counts(self.scan(text)['project_counts'])
+
+    @staticmethod
+    def _empty_features():
+        """Feature structure before any page is read"""
+        return {
             'education': {
                 'degree': [],
                 'major': [],
@@ -86,42 +187,91 @@ class ResumeAnalyzer:
             'experience_years': None,
             'project_experience_score': None
         }
+
+    @classmethod
+    def check_required_fields(cls, required_fields, cached=False):
+        """Raise ValueError unless every required field is a leaf feature path.
+
+        Also raised for required fields with cached analysis, which always
+        reads every page and would silently ignore them.
+        """
+        if required_fields and cached:
+            raise ValueError("Required fields only apply to uncached analysis; disable the cache")
+        for field in required_fields:
+            value = cls._empty_features()
+            for key in field.split('.'):
+                if not isinstance(value, dict) or key not in value:
+                    raise ValueError(f"Unknown required field {field!r}")
+                value = value[key]
+            if isinstance(value, dict):
+                # A group like 'education' is always present, so never missing
+                raise ValueError(f"Required field {field!r} is a group; name one of its fields, "
+                                 f"e.g. {field}.{next(iter(value))}")
+
+    def _has_required_fields(self, features):
+        """True once every field in required_fields (dotted paths) has a value"""
+        for field in self.required_fields:
+            value = features
+            for key in field.split('.'):
+                value = value[key]
+            if value is None or (hasattr(value, '__len__') and len(value) == 0):
+                return False
+        return True
+
+    def extract_features(self, text):
+        """Extract relevant features from resume text"""
+        return self.extract_features_from_pages([text])
+
+    def extract_features_from_pages(self, pages, early_exit=False):
+        """Extract features from an iterable of page texts, one page at a time.
+
+        With early_exit and required_fields set, stops pulling pages as soon
+        as every required field has a value; the remaining pages are never
+        read, at the cost of missing skills that only appear on them.
+        """
+        features = self._empty_features()
+        project_counts = dict.fromkeys(PROJECT_INDICATORS, 0)
+        # One taxonomy for the whole document, even if it is reloaded meanwhile
+        taxonomy = self.taxonomy.get()
         
-        # Extract education details
-        for edu_type, pattern in self.patterns['education'].items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            if edu_type == 'gpa':
-                gpa_match = re.search(pattern, text)
-                if gpa_match:
-                    gpa_text = gpa_match.group()
-                    features['education']['gpa'] = float(re.search(r'[0-9]+\.[0-9]+', gpa_text).group())
-            else:
-                features['education'][edu_type] = [match.group() for match in matches]
-        
-        # Extract technical skills
-        for category, pattern in self.patterns['technical_skills'].items():
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            features['technical_skills'][category].update(match.group() for match in matches)
-        
-        # Extract soft skills
-        soft_skills_matches = re.finditer(self.patterns['soft_skills'], text, re.IGNORECASE)
-        features['soft_skills'].update(match.group() for match in soft_skills_matches)
-        
-        # Extract project keywords
-        project_matches = re.finditer(self.patterns['project_keywords'], text, re.IGNORECASE)
-        features['project_keywords'].update(match.group() for match in project_matches)
-        
-        # Extract experience years
-        exp_match = re.search(self.patterns['experience'], text, re.IGNORECASE)
-        if exp_match:
-            exp_text = exp_match.group()
-            years = float(re.search(r'\d+', exp_text).group())
-            if 'month' in exp_text.lower():
-                years = years / 12
-            features['experience_years'] = round(years, 1)
+        for page in pages:
+            matches = self.scan(page.replace('\n', ' '), taxonomy)
+            
+            # Extract education details (first GPA in the document wins)
+            features['education']['degree'].extend(matches['education_degree'])
+            features['education']['major'].extend(matches['education_major'])
+            if features['education']['gpa'] is None and matches['education_gpa']:
+                gpa_text = matches['education_gpa'][0]
+                features['education']['gpa'] = float(DECIMAL_PATTERN.search(gpa_text).group())
+            
+            # Sort taxonomy skills into technical categories and soft skills
+            for skill in matches['skills']:
+                kind = taxonomy.kind_of(skill)
+                if kind == 'soft_skills':
+                    features['soft_skills'].add(skill)
+                elif kind in features['technical_skills']:
+                    features['technical_skills'][kind].add(skill)
+            
+            # Extract project keywords
+            features['project_keywords'].update(matches['project_keywords'])
+            
+            # Extract experience years (first mention in the document wins)
+            if features['experience_years'] is None and matches['experience']:
+                exp_text = matches['experience'][0]
+                years = float(NUMBER_PATTERN.search(exp_text).group())
+                if 'month' in exp_text.lower():
+                    years = years / 12
+                features['experience_years'] = round(years, 1)
+            
+            # Project indicators are summed across pages and scored once at the end
+            for name, count in matches['project_counts'].items():
+                project_counts[name] += count
+            
+            if early_exit and self.required_fields and self._has_required_fields(features):
+                break
         
         # Calculate project experience score
-        features['project_experience_score'] = self.calculate_project_score(text)
+        features['project_experience_score'] = self._score_project_counts(project_counts)
         
         # Convert sets to lists for JSON serialization
         features['technical_skills'] = {k: list(v) for k, v in features['technical_skills'].items()}
@@ -130,15 +280,48 @@ class ResumeAnalyzer:
         
         return features
 
-    def analyze_resume(self, pdf_path):
-        """Analyze resume and extract features"""
-        # Extract text from PDF
-        text = self.extract_text_from_pdf(pdf_path)
-        if text.startswith("Error"):
-            return {"error": text}
+    def _analyze_cached(self, pdf_path):
+        """Features for a PDF, skipping PDF parsing and/or extraction on cache hits"""
+        try:
+            with open(pdf_path, 'rb') as file:
+                data = file.read()
+        except OSError as e:
+            return None, f"Error reading PDF: {str(e)}"
+        
+        digest = hash_bytes(data)
+        version = self.pattern_version
+        features = self.cache.get_features(digest, version)
+        if features is not None:
+            return features, None
+        
+        # Text does not depend on the patterns, so it survives a pattern change.
+        # The whole (page-limited) text is cached, so no early exit here
+        text_key = digest if self.max_pages is None else f"{digest}:{self.max_pages}"
+        text = self.cache.get_text(text_key)
+        if text is None:
+            text = self.extract_text_from_pdf(io.BytesIO(data))
+            if text.startswith("Error"):
+                return None, text
+            self.cache.put_text(text_key, text)
         
-        # Extract features
         features = self.extract_features(text)
+        self.cache.put_features(digest, version, features)
+        return features, None
+
+    def analyze_resume(self, pdf_path):
+        """Analyze resume and extract features"""
+        if self.cache is not None:
+            features, error = self._analyze_cached(pdf_path)
+            if error:
+                return {"error": error}
+        else:
+            # Stream pages straight into feature extraction without building the full text
+            try:
+                with open(pdf_path, 'rb') as file:
+                    features = self.extract_features_from_pages(self.iter_pdf_pages(file),
+                                                                early_exit=True)
+            except Exception as e:
+                return {"error": f"Error reading PDF: {str(e)}"}
         
         # Prepare model input features
         model_features = {
@@ -146,12 +329,12 @@ class ResumeAnalyzer:
             'Coding Experience (Years)': features['experience_years'] if features['experience_years'] else 0,
             'Work_Experience': features['experience_years'] if features['experience_years'] else 0,
             'Project Experience': features['project_experience_score'],
-            'Technical_Skills': ', '.join(
+            'Technical_Skills': join_skills(
                 features['technical_skills']['programming'] + 
                 features['technical_skills']['frameworks'] +
                 features['technical_skills']['ml_tools']
             ),
-            'Soft_Skills': ', '.join(features['soft_skills']),
+            'Soft_Skills': join_skills(features['soft_skills']),
             'Academic Background': features['education']['major'][0] if features['education']['major'] else 'Unknown',
             'Personality Type': 'Unknown',  # Would need additional analysis
             'Work Preference': 'Unknown'    # Would need additional analysis
@@ -163,7 +346,7 @@ class ResumeAnalyzer:
         }
 
 def main():
-    analyzer = ResumeAnalyzer()
+    analyzer = ResumeAnalyzer(cache=ResumeCache())
     
     print("Resume Feature Analyzer")
     print("-" * 50)
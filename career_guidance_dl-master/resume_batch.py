@@ -0,0 +1,148 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from resume_analyzer import ResumeAnalyzer
+from resume_cache import ResumeCache
+from skill_taxonomy import get_taxonomy_loader
+
+# Analyzer instance owned by each worker process
+_analyzer = None
+
+def _init_worker(cache_path=None, max_pages=None, required_fields=None, taxonomy_path=None):
+    global _analyzer
+    _analyzer = ResumeAnalyzer(cache=ResumeCache(cache_path) if cache_path else None,
+                               max_pages=max_pages, required_fields=required_fields,
+                               taxonomy=get_taxonomy_loader(taxonomy_path))
+
+def _analyze_one(path):
+    """Worker entry point: never raises, so one bad file cannot abort the batch"""
+    try:
+        result = _analyzer.analyze_resume(path)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    return path, result
+
+def find_resumes(source):
+    """Resolve a directory (searched recursively for PDFs) or a glob pattern to sorted paths"""
+    if os.path.isdir(source):
+        pattern = os.path.join(source, '**', '*.pdf')
+    else:
+        pattern = source
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+class CareerScorer:
+    """Scores buffered model_features with the career predictor in batches"""
+
+    def __init__(self, model_path, batch_size=256):
+        import career_predictor_simple
+        from career_preprocessor import features_to_frame
+
+        self._predict_batch = career_predictor_simple.predict_career_batch
+        self._features_to_frame = features_to_frame
+        self.model_data = career_predictor_simple.load_model(model_path)
+        self.batch_size = batch_size
+
+    def score(self, records):
+        """Attach predicted_career / career_confidence to each successful record"""
+        scorable = [record for record in records if 'model_features' in record['result']]
+        if not scorable:
+            return
+        frame = self._features_to_frame([record['result']['model_features'] for record in scorable])
+        predictions, probabilities = self._predict_batch(self.model_data, frame)
+        careers = self.model_data['preprocessor'].decode_target(predictions)
+        for record, career, row in zip(scorable, careers, probabilities):
+            record['result']['predicted_career'] = career
+            record['result']['career_confidence'] = round(float(row.max()), 4)
+
+def analyze_resumes_batch(paths, output_path, workers=None, scorer=None, progress=None,
+                          cache_path=None, max_pages=None, required_fields=None,
+                          taxonomy_path=None):
+    """Analyze resumes across a process pool, streaming JSON Lines as they finish.
+
+    Each line is {"path": ..., "result": ...}; failures carry an "error" in
+    the result instead of stopping the batch. With a CareerScorer, records
+    are buffered and scored scorer.batch_size at a time before being
+    written. With cache_path, workers share a ResumeCache so known resumes
+    skip PDF parsing. max_pages, required_fields and taxonomy_path are
+    passed to each worker's ResumeAnalyzer. Returns a summary of counts.
+    """
+    # Fail here, before any worker starts, on a misspelled field
+    ResumeAnalyzer.check_required_fields(required_fields or [], cached=cache_path is not None)
+    summary = {'analyzed': 0, 'failed': 0}
+    pending = []
+
+    def flush(output):
+        if scorer is not None:
+            scorer.score(pending)
+        for record in pending:
+            output.write(json.dumps(record) + '\n')
+        output.flush()
+        pending.clear()
+
+    with open(output_path, 'w', encoding='utf-8') as output, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(cache_path, max_pages, required_fields, taxonomy_path)) as executor:
+        futures = [executor.submit(_analyze_one, path) for path in paths]
+        for future in as_completed(futures):
+            path, result = future.result()
+            summary['failed' if 'error' in result else 'analyzed'] += 1
+            pending.append({'path': path, 'result': result})
+            if scorer is None or len(pending) >= scorer.batch_size:
+                flush(output)
+            if progress is not None:
+                progress(path, result, summary)
+        flush(output)
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory or glob of resume PDFs")
+    parser.add_argument('source', help="Directory of PDFs or a glob such as 'resumes/**/*.pdf'")
+    parser.add_argument('-o', '--output', default='resume_analysis.jsonl')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--predict', metavar='MODEL',
+                        help="Score model_features with a career_predictor_simple.joblib bundle")
+    parser.add_argument('--predict-batch-size', type=int, default=256)
+    parser.add_argument('--cache', default='resume_cache.sqlite', help="Resume cache path")
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help="Only read the first N pages of each PDF")
+    parser.add_argument('--require', action='append', default=None, metavar='FIELD',
+                        help="Stop reading pages once this feature is found, e.g. education.major "
+                             "(repeatable; needs --no-cache)")
+    parser.add_argument('--taxonomy', default=None, help="Skill taxonomy JSON (default: skill_taxonomy.json)")
+    args = parser.parse_args()
+    try:
+        ResumeAnalyzer.check_required_fields(args.require or [], cached=not args.no_cache)
+    except ValueError as e:
+        parser.error(str(e))
+
+    paths = find_resumes(args.source)
+    if not paths:
+        print(f"No PDF files found for {args.source}")
+        return
+
+    scorer = CareerScorer(args.predict, args.predict_batch_size) if args.predict else None
+
+    def report(path, result, summary):
+        done = summary['analyzed'] + summary['failed']
+        if 'error' in result:
+            print(f"[{done}/{len(paths)}] {path}: {result['error']}")
+        elif done % 100 == 0 or done == len(paths):
+            print(f"[{done}/{len(paths)}] analyzed")
+
+    print(f"Analyzing {len(paths)} resumes into {args.output}")
+    start = time.time()
+    summary = analyze_resumes_batch(paths, args.output, args.workers, scorer, report,
+                                    cache_path=None if args.no_cache else args.cache,
+                                    max_pages=args.max_pages, required_fields=args.require,
+                                    taxonomy_path=args.taxonomy)
+    print(f"\nDone in {time.time() - start:.1f}s: {summary['analyzed']} analyzed, "
+          f"{summary['failed']} failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import hashlib
+import json
+
+from sqlite_store import SqliteStore
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+class ResumeCache:
+    """Persistent, size-bounded LRU cache of resume analysis results.
+
+    Keyed by the SHA-256 of the PDF bytes, so a renamed or re-uploaded file
+    still hits. Extracted text is stored per document; extracted features
+    are stored per (document, analyzer pattern version), so changing the
+    analyzer's patterns invalidates features without re-parsing any PDF.
+    Safe to share between threads and between processes (SQLite locking).
+    """
+
+    def __init__(self, path='resume_cache.sqlite', max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.store = SqliteStore(path, max_bytes)
+
+    def get_text(self, digest):
+        return self._get(f"text:{digest}")
+
+    def put_text(self, digest, text):
+        self._put(f"text:{digest}", text)
+
+    def get_features(self, digest, version):
+        value = self._get(f"features:{version}:{digest}")
+        return json.loads(value) if value is not None else None
+
+    def put_features(self, digest, version, features):
+        self._put(f"features:{version}:{digest}", json.dumps(features))
+
+    def clear(self):
+        self.store.clear()
+
+    def close(self):
+        self.store.close()
+
+    def _get(self, key):
+        entry = self.store.get(key)
+        return entry[0].decode('utf-8') if entry is not None else None
+
+    def _put(self, key, value):
+        self.store.put(key, value.encode('utf-8'))
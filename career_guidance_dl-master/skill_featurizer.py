@@ -0,0 +1,92 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Comma-joined skill columns in realistic_career_data.csv
+SKILL_COLUMNS = ['Technical_Skills', 'Soft_Skills', 'Interests', 'Preferred Tech Stack']
+
+def _explode_tokens(values):
+    """Return a Series of normalized tokens indexed by row position"""
+    tokens = pd.Series(np.asarray(values, dtype=object)).fillna('').astype(str)
+    tokens = tokens.str.split(',').explode().str.strip().str.lower()
+    return tokens[tokens != '']
+
+class SkillFeaturizer:
+    """Multi-hot featurizer for comma-joined skill columns.
+
+    Each column gets its own fixed token vocabulary, so "Python, NLP" and
+    "NLP, Python" produce the same row. transform() returns a CSR matrix with
+    one block of columns per skill column; tokens outside the vocabulary are
+    ignored and columns missing from the input are treated as empty.
+    """
+
+    def __init__(self, columns=None, min_frequency=1, max_tokens=None):
+        self.columns = list(columns) if columns is not None else list(SKILL_COLUMNS)
+        self.min_frequency = min_frequency
+        self.max_tokens = max_tokens
+        self.vocabularies_ = {}
+        self.offsets_ = {}
+        self.n_features_ = 0
+        self.token_counts_ = {}
+
+    def reset(self):
+        """Forget everything fitted, before a new series of partial_fit calls"""
+        self.vocabularies_ = {}
+        self.offsets_ = {}
+        self.n_features_ = 0
+        self.token_counts_ = {}
+        return self
+
+    def fit(self, df):
+        """Build the per-column token vocabularies"""
+        return self.reset().partial_fit(df)
+
+    def partial_fit(self, df):
+        """Add the token counts of another chunk of rows and rebuild the vocabularies.
+
+        Fitting chunk by chunk gives the same vocabularies as one fit() on
+        all rows, so min_frequency and max_tokens apply to the whole dataset.
+        """
+        for column in self.columns:
+            counts = self.token_counts_.setdefault(column, Counter())
+            if column in df:
+                counts.update(_explode_tokens(df[column]).values)
+
+        self.vocabularies_ = {}
+        self.offsets_ = {}
+        offset = 0
+        for column in self.columns:
+            counts = self.token_counts_[column]
+            tokens = [token for token, count in counts.most_common(self.max_tokens)
+                      if count >= self.min_frequency]
+            self.vocabularies_[column] = {token: i for i, token in enumerate(sorted(tokens))}
+            self.offsets_[column] = offset
+            offset += len(tokens)
+        self.n_features_ = offset
+        return self
+
+    def transform(self, df):
+        """Encode the skill columns as a float32 CSR multi-hot matrix"""
+        num_rows = len(df)
+        rows, cols = [], []
+        for column in self.columns:
+            if column not in df:
+                continue
+            tokens = _explode_tokens(df[column])
+            codes = tokens.map(self.vocabularies_[column])
+            known = codes.notna().values
+            rows.append(tokens.index.values[known])
+            cols.append(codes.values[known].astype(np.int64) + self.offsets_[column])
+
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                   shape=(num_rows, self.n_features_))
+        # Repeated tokens in one cell are summed by the constructor; clamp to 1
+        matrix.data[:] = 1
+        return matrix
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
@@ -0,0 +1,14 @@
+# Kept free of pandas/numpy so the analyzers can import it cheaply
+
+def join_skills(skills):
+    """Join skills into the canonical comma-joined form used by the models.
+
+    Duplicates (case-insensitive) are dropped and the order is fixed, so the
+    same set of skills always produces the same string.
+    """
+    unique = {}
+    for skill in skills:
+        skill = skill.strip()
+        if skill:
+            unique.setdefault(skill.lower(), skill)
+    return ', '.join(unique[key] for key in sorted(unique))
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from keyword_matcher import KeywordMatcher
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+
+class TaxonomyError(ValueError):
+    """Raised when a taxonomy file is malformed"""
+
+class SkillTaxonomy:
+    """Canonical skills with their aliases, compiled into one KeywordMatcher.
+
+    Each skill has a display name, extra aliases, a kind (the resume
+    analyzer's grouping: programming, frameworks, ml_tools, databases,
+    devops, soft_skills) and domains (the GitHub analyzer's grouping:
+    frontend, backend, database, devops, ai_ml). Matching is
+    case-insensitive on whole words, except for the aliases a skill lists
+    under case_sensitive; the name itself always counts as an alias, and
+    every match is reported under the canonical name.
+    """
+
+    def __init__(self, skills, digest=''):
+        self.skills = []
+        self.digest = digest
+        # Aliases matched only as written, e.g. 'Go' but not 'go to'
+        self.case_sensitive = set()
+        self._by_name = {}
+        for skill in skills:
+            if not isinstance(skill, dict) or not skill.get('name') or not skill.get('kind'):
+                raise TaxonomyError(f"Every skill needs a name and a kind: {skill!r}")
+            name = skill['name']
+            if name in self._by_name:
+                raise TaxonomyError(f"Duplicate skill: {name}")
+            skill = {
+                'name': name,
+                'aliases': [name] + [alias for alias in skill.get('aliases', []) if alias != name],
+                'kind': skill['kind'],
+                'domains': list(skill.get('domains', [])),
+                'case_sensitive': list(skill.get('case_sensitive', []))
+            }
+            unknown = set(skill['case_sensitive']) - set(skill['aliases'])
+            if unknown:
+                raise TaxonomyError(f"case_sensitive lists aliases {name} does not have: {sorted(unknown)}")
+            self.case_sensitive.update(skill['case_sensitive'])
+            self.skills.append(skill)
+            self._by_name[name] = skill
+        self.matcher = KeywordMatcher(
+            ((alias, skill['name'], skill['kind']) for skill in self.skills for alias in skill['aliases']),
+            self.case_sensitive
+        )
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY_PATH):
+        with open(path, 'rb') as file:
+            raw = file.read()
+        try:
+            data = json.loads(raw.decode('utf-8'))
+        except ValueError as e:
+            raise TaxonomyError(f"Invalid taxonomy file {path}: {e}")
+        if not isinstance(data, dict) or not isinstance(data.get('skills'), list):
+            raise TaxonomyError(f"Invalid taxonomy file {path}: expected a 'skills' list")
+        return cls(data['skills'], hashlib.sha256(raw).hexdigest())
+
+    def find(self, text):
+        """Set of canonical skill names mentioned in text"""
+        return self.matcher.find(text)
+
+    def kind_of(self, name):
+        return self._by_name[name]['kind']
+
+    def domains_of(self, name):
+        return self._by_name[name]['domains']
+
+    def entries_by_domain(self):
+        """(alias, name, domain) entries, for matchers grouped by domain"""
+        for skill in self.skills:
+            for domain in skill['domains']:
+                for alias in skill['aliases']:
+                    yield alias, skill['name'], domain
+
+class TaxonomyLoader:
+    """The current SkillTaxonomy of a file, reloaded when the file changes.
+
+    get() stats the file at most once per check_interval seconds and
+    re-parses it only when its mtime or size moved, so long-running
+    processes pick up new skills without a restart. A file that fails to
+    parse (e.g. half-saved) keeps the previous taxonomy in service.
+    """
+
+    def __init__(self, path=DEFAULT_TAXONOMY_PATH, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._checked_at = 0.0
+        self._taxonomy = None
+        self.get()
+
+    def _stat(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        if self._taxonomy is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._taxonomy
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stamp = self._stat()
+                if stamp != self._stamp or self._taxonomy is None:
+                    # Recorded first, so a broken file is reported once, not on every check
+                    self._stamp = stamp
+                    self._taxonomy = SkillTaxonomy.from_file(self.path)
+            except (OSError, TaxonomyError) as e:
+                if self._taxonomy is None:
+                    raise
+                print(f"Keeping the previous skill taxonomy: {e}")
+            return self._taxonomy
+
+# One loader per taxonomy file, shared by every analyzer in the process
+_loaders = {}
+_loaders_lock = threading.Lock()
+
+def get_taxonomy_loader(path=None):
+    """Shared TaxonomyLoader for path (default: skill_taxonomy.json next to this module)"""
+    path = os.path.abspath(path or DEFAULT_TAXONOMY_PATH)
+    with _loaders_lock:
+        if path not in _loaders:
+            _loaders[path] = TaxonomyLoader(path)
+        return _loaders[path]
@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import threading
+import time
+
+class SqliteStore:
+    """Persistent, size-bounded LRU key-value store in one SQLite file.
+
+    Each entry is a bytes value plus an optional JSON-able meta dict. When
+    the stored values exceed max_bytes the least recently used entries are
+    evicted. The running total lives in the database and is updated in the
+    same transaction as each write, so it stays exact when several threads
+    or processes share the file. Backs http_cache.ResponseCache and
+    resume_cache.ResumeCache.
+    """
+
+    def __init__(self, path, max_bytes, timeout=30):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Autocommit; writes that must be atomic open their own transaction
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        # WAL keeps the per-access bookkeeping writes from fsyncing every read
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS store (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                meta TEXT,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS store_accessed ON store (accessed_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS store_size (id INTEGER PRIMARY KEY, total INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO store_size VALUES (0, 0)")
+
+    def get(self, key):
+        """(value, meta) for key, or None; marks the entry as recently used"""
+        with self._lock:
+            row = self._conn.execute("SELECT value, meta FROM store WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE store SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        value, meta = row
+        return value, json.loads(meta) if meta is not None else None
+
+    def put(self, key, value, meta=None):
+        """Store value (bytes) under key, evicting old entries past max_bytes"""
+        meta = json.dumps(meta) if meta is not None else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self._conn.execute("SELECT size FROM store WHERE key = ?", (key,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO store VALUES (?, ?, ?, ?, ?)",
+                                   (key, value, meta, len(value), time.time()))
+                total = self._conn.execute("SELECT total FROM store_size").fetchone()[0]
+                total += len(value) - (previous[0] if previous else 0)
+                total = self._evict(total)
+                self._conn.execute("UPDATE store_size SET total = ?", (total,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_meta(self, key, meta):
+        """Replace the meta of an existing entry (keeping its value)"""
+        with self._lock:
+            self._conn.execute("UPDATE store SET meta = ?, accessed_at = ? WHERE key = ?",
+                               (json.dumps(meta), time.time(), key))
+
+    def total_bytes(self):
+        with self._lock:
+            return self._conn.execute("SELECT total FROM store_size").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM store")
+            self._conn.execute("UPDATE store_size SET total = 0")
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self, total):
+        """Drop least recently used entries until total fits max_bytes; returns the new total"""
+        while total > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM store ORDER BY accessed_at LIMIT 64").fetchall()
+            if not rows:
+                return 0
+            for key, size in rows:
+                self._conn.execute("DELETE FROM store WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        return total